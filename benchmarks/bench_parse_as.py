@@ -0,0 +1,238 @@
+"""Offline benchmarks for `yt.utilities.parse_as`.
+
+Runs every (type, mode, size) case in a fresh subprocess so peak RSS is
+per-case, and writes the results as JSON that can be compared against a
+stored baseline (`yt` is imported from the checkout's `src/`, so installing it
+is not required):
+
+```shell
+python benchmarks/bench_parse_as.py --output bench.json
+python benchmarks/bench_parse_as.py --sizes 1KB,1MB --baseline bench.json
+```
+"""
+
+import argparse
+import json
+import multiprocessing
+import platform
+import resource
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+# importable from a plain checkout too: spawned workers re-run this on import
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+SIZES = {"1KB": 1 << 10, "100KB": 100 << 10, "10MB": 10 << 20, "100MB": 100 << 20}
+KINDS = ("scalar", "flat", "nested", "list")
+MODES = ("python", "json", "strings")
+
+
+def _parse_size(size: str) -> int:
+    units = {"KB": 1 << 10, "MB": 1 << 20, "GB": 1 << 30}
+    for unit, factor in units.items():
+        if size.upper().endswith(unit):
+            return int(float(size[: -len(unit)]) * factor)
+    return int(size)
+
+
+def _models():
+    from pydantic import BaseModel
+
+    class FlatModel(BaseModel):
+        id: int
+        name: str
+        score: float
+        active: bool
+        note: str
+
+    class NestedModel(BaseModel):
+        id: int
+        owner: FlatModel
+        children: list[FlatModel]
+
+    return FlatModel, NestedModel
+
+
+def _record(i: int, note: str = "") -> dict[str, Any]:
+    return {
+        "id": i,
+        "name": f"user-{i}",
+        "score": i / 7,
+        "active": i % 2 == 0,
+        "note": note,
+    }
+
+
+def build_case(kind: str, size: int) -> tuple[Any, Any]:
+    """Return `(type_, python_payload)` whose JSON encoding is roughly `size` bytes."""
+    FlatModel, NestedModel = _models()
+    record_size = len(json.dumps(_record(0)))
+    n_records = max(1, size // record_size)
+
+    if kind == "scalar":
+        return str, "x" * max(1, size - 2)
+    if kind == "flat":
+        return FlatModel, _record(0, note="x" * max(0, size - record_size))
+    if kind == "nested":
+        return NestedModel, {
+            "id": 0,
+            "owner": _record(0),
+            "children": [_record(i) for i in range(n_records)],
+        }
+    if kind == "list":
+        return list[FlatModel], [_record(i) for i in range(n_records)]
+    raise ValueError(f"unknown kind: {kind}")
+
+
+def _stringify(data: Any) -> Any:
+    if isinstance(data, dict):
+        return {k: _stringify(v) for k, v in data.items()}
+    if isinstance(data, list):
+        return [_stringify(v) for v in data]
+    if isinstance(data, bool):
+        return str(data).lower()
+    return str(data)
+
+
+def _percentile(sorted_values: list[int], q: float) -> float:
+    index = min(len(sorted_values) - 1, round(q / 100 * (len(sorted_values) - 1)))
+    return sorted_values[index]
+
+
+def run_case(
+    kind: str, mode: str, size_label: str, min_time: float, max_iters: int
+) -> dict[str, Any]:
+    from pydantic import ValidationError
+
+    from yt.utilities import parse_as
+
+    type_, payload = build_case(kind, _parse_size(size_label))
+    encoded = json.dumps(payload)
+    data = {"python": payload, "json": encoded, "strings": _stringify(payload)}[mode]
+    result = {
+        "kind": kind,
+        "mode": mode,
+        "size": size_label,
+        "payload_bytes": len(encoded),
+    }
+
+    try:
+        parse_as(type_, data, mode=mode)  # warm up (and build the cached adapter)
+    except ValidationError as e:
+        return result | {"skipped": f"unsupported: {e.errors()[0]['msg']}"}
+
+    timings: list[int] = []
+    deadline = time.perf_counter() + min_time
+    while len(timings) < max_iters and (
+        len(timings) < 3 or time.perf_counter() < deadline
+    ):
+        start = time.perf_counter_ns()
+        parse_as(type_, data, mode=mode)
+        timings.append(time.perf_counter_ns() - start)
+
+    timings.sort()
+    mean_s = sum(timings) / len(timings) / 1e9
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return result | {
+        "iterations": len(timings),
+        "mean_ms": mean_s * 1e3,
+        "p50_ms": _percentile(timings, 50) / 1e6,
+        "p90_ms": _percentile(timings, 90) / 1e6,
+        "p99_ms": _percentile(timings, 99) / 1e6,
+        "throughput_mb_s": len(encoded) / mean_s / 1e6,
+        # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+        "peak_rss_mb": max_rss / (1 << 20 if sys.platform == "darwin" else 1 << 10),
+    }
+
+
+def compare(
+    results: list[dict[str, Any]], baseline: list[dict[str, Any]], threshold: float
+) -> list[dict[str, Any]]:
+    """Return the cases whose p50 latency regressed by more than `threshold`."""
+    previous = {(r["kind"], r["mode"], r["size"]): r for r in baseline}
+    regressions = []
+    for result in results:
+        before = previous.get((result["kind"], result["mode"], result["size"]))
+        if not before or "p50_ms" not in before or "p50_ms" not in result:
+            continue
+        ratio = result["p50_ms"] / before["p50_ms"]
+        result["p50_vs_baseline"] = ratio
+        if ratio > 1 + threshold:
+            regressions.append(result)
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default=",".join(SIZES))
+    parser.add_argument("--kinds", default=",".join(KINDS))
+    parser.add_argument("--modes", default=",".join(MODES))
+    parser.add_argument("--min-time", type=float, default=1.0, help="seconds per case")
+    parser.add_argument("--max-iters", type=int, default=10_000)
+    parser.add_argument("--output", default="bench_parse_as.json")
+    parser.add_argument("--baseline", help="results JSON to compare against")
+    parser.add_argument(
+        "--threshold", type=float, default=0.1, help="allowed p50 slowdown (0.1 = 10%%)"
+    )
+    args = parser.parse_args()
+
+    cases = [
+        (kind, mode, size)
+        for size in args.sizes.split(",")
+        for kind in args.kinds.split(",")
+        for mode in args.modes.split(",")
+    ]
+
+    results = []
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(processes=1, maxtasksperchild=1) as pool:
+        for kind, mode, size in cases:
+            result = pool.apply(
+                run_case, (kind, mode, size, args.min_time, args.max_iters)
+            )
+            results.append(result)
+            if "skipped" in result:
+                print(f"{kind:>7} {mode:>8} {size:>6}  {result['skipped']}")
+            else:
+                print(
+                    f"{kind:>7} {mode:>8} {size:>6}  "
+                    f"p50 {result['p50_ms']:10.3f} ms  p99 {result['p99_ms']:10.3f} ms  "
+                    f"{result['throughput_mb_s']:9.1f} MB/s  "
+                    f"rss {result['peak_rss_mb']:8.1f} MB"
+                )
+
+    exit_code = 0
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f)["results"], args.threshold)
+        for r in regressions:
+            print(
+                f"REGRESSION {r['kind']} {r['mode']} {r['size']}: "
+                f"p50 {r['p50_vs_baseline']:.2f}x baseline"
+            )
+        exit_code = 1 if regressions else 0
+
+    from importlib.metadata import version
+
+    with open(args.output, "w") as f:
+        json.dump(
+            {
+                "meta": {
+                    "timestamp": datetime.now(timezone.utc).isoformat(),
+                    "python": platform.python_version(),
+                    "platform": platform.platform(),
+                    "pydantic": version("pydantic"),
+                },
+                "results": results,
+            },
+            f,
+            indent=2,
+        )
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,153 @@
+import math
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Literal
+
+import numpy as np
+from settings import settings
+from signals import PressureSignals
+from state import ConnectionState
+
+PolicyName = Literal["threshold", "forecast"]
+
+
+def scaling_signal(signals: PressureSignals) -> float:
+    if settings.scaling_signal == "percentile":
+        return signals.percentile(settings.scaling_percentile)
+    return signals.ewma(settings.emwa_alpha)
+
+
+class Policy(ABC):
+    """Decides, once per step, whether to add (`1`) or retire (`-1`) a server.
+
+    `observe` is fed the step's arrival count before `decide` is called;
+    `signals` has already been updated with the step's pressure.
+    """
+
+    name: PolicyName
+
+    def __init__(self, state: ConnectionState, signals: PressureSignals):
+        self.state = state
+        self.signals = signals
+
+    def reset(self):
+        pass
+
+    def observe(self, arrivals: int):
+        pass
+
+    @abstractmethod
+    def decide(self) -> int:
+        pass
+
+
+class ThresholdPolicy(Policy):
+    """Compare the pressure signal against the scale up/down thresholds."""
+
+    name = "threshold"
+
+    def decide(self) -> int:
+        signal = scaling_signal(self.signals)
+        rising = (
+            settings.scale_up_rate_threshold is not None
+            and self.signals.rate() > settings.scale_up_rate_threshold
+        )
+        if signal > settings.server_scale_up_threshold or rising:
+            return 1
+        if signal < settings.server_scale_down_threshold:
+            return -1
+        return 0
+
+
+def detect_period(series: np.ndarray, min_correlation: float = 0.5) -> int | None:
+    """Strongest autocorrelation lag of `series`, if it is clearly periodic."""
+    x = series - series.mean()
+    if len(x) < 8 or not x.any():
+        return None
+    acf = np.correlate(x, x, "full")[len(x) - 1 :]
+    acf /= acf[0]
+    lag = int(np.argmax(acf[2 : len(x) // 2])) + 2
+    return lag if acf[lag] >= min_correlation else None
+
+
+class ArrivalForecast:
+    """Servers needed for the demand expected over the next `forecast_horizon` steps.
+
+    The arrival period is found by autocorrelation over the last
+    `forecast_window` steps; future arrivals repeat the last period, and
+    active clients are estimated by Little's law as the arrivals within one
+    mean lifetime (capped at the client pool). Servers are sized so the
+    forecast peak sits at `server_scale_up_threshold`.
+    """
+
+    def __init__(self):
+        self.arrivals: deque[int] = deque(maxlen=settings.forecast_window)
+        self.period: int | None = None
+
+    def observe(self, arrivals: int):
+        self.arrivals.append(arrivals)
+        # re-detect a few times per window rather than every step
+        if len(self.arrivals) % max(1, settings.forecast_window // 4) == 0:
+            self.period = detect_period(np.array(self.arrivals, dtype=float))
+
+    def forecast_active(self, pool_size: int) -> float:
+        """Peak estimated active clients over the forecast horizon."""
+        history = np.array(self.arrivals, dtype=float)
+        period, lifetime = self.period, max(1, round(settings.client_lifetime_mean))
+        horizon = settings.forecast_horizon
+        last_period = history[-period:]
+        future = np.resize(last_period, horizon)  # seasonal naive: repeat a period
+        series = np.concatenate([history, future])
+        active = np.convolve(series, np.ones(lifetime), "valid")
+        return min(float(active[-horizon:].max()), pool_size)
+
+    def servers_needed(self, pool_size: int) -> int | None:
+        """`None` until a period is detected and a lifetime of arrivals is seen."""
+        lifetime = round(settings.client_lifetime_mean)
+        if self.period is None or len(self.arrivals) < self.period + lifetime:
+            return None
+        per_server = settings.max_connections * settings.server_scale_up_threshold
+        return max(
+            settings.min_servers,
+            math.ceil(self.forecast_active(pool_size) / per_server),
+        )
+
+
+class ForecastPolicy(ThresholdPolicy):
+    """Scale to the demand an `ArrivalForecast` expects.
+
+    Without a clear period (e.g. constant arrivals) this falls back to the
+    threshold policy.
+    """
+
+    name = "forecast"
+
+    def reset(self):
+        self.forecast = ArrivalForecast()
+
+    def observe(self, arrivals: int):
+        self.forecast.observe(arrivals)
+
+    def decide(self) -> int:
+        needed = self.forecast.servers_needed(len(self.state.client_names))
+        if needed is None:
+            return super().decide()
+        serving = len(self.state.servers) - len(self.state.draining)
+        if needed > serving:
+            return 1
+        # keep a server of slack before scaling down, so a noisy forecast hovering
+        # at a boundary doesn't flap
+        return -1 if needed < serving - 1 else 0
+
+
+POLICIES: dict[PolicyName, type[Policy]] = {
+    policy.name: policy for policy in (ThresholdPolicy, ForecastPolicy)
+}
+
+
+def make_policy(
+    name: PolicyName, state: ConnectionState, signals: PressureSignals
+) -> Policy:
+    policy = POLICIES[name](state, signals)
+    policy.reset()
+    return policy
@@ -0,0 +1,163 @@
+import heapq
+from abc import ABC, abstractmethod
+from bisect import bisect, insort
+from hashlib import blake2b
+from typing import Literal
+
+import numpy as np
+from state import ConnectionState
+
+StrategyName = Literal[
+    "random", "round_robin", "least_connections", "power_of_two", "consistent_hash"
+]
+
+
+class Strategy(ABC):
+    """Picks the server for a new client without scanning every server.
+
+    Only servers in `state.available` (i.e. below `max_connections`) may be
+    picked. Strategies that keep their own index are told about changes through
+    the `on_*` hooks, which `ConnectionState` calls.
+    """
+
+    name: StrategyName
+
+    def __init__(self, state: ConnectionState):
+        self.state = state
+        state.balancer = self
+
+    @abstractmethod
+    def select(self, client: int) -> int | None:
+        pass
+
+    def reset(self):
+        pass
+
+    def on_add_server(self, server: int):
+        pass
+
+    def on_remove_server(self, server: int):
+        pass
+
+    def on_load_change(self, server: int):
+        pass
+
+
+class RandomStrategy(Strategy):
+    name = "random"
+
+    def select(self, client: int) -> int | None:
+        return self.state.available.choice() if self.state.available else None
+
+
+class RoundRobinStrategy(Strategy):
+    name = "round_robin"
+
+    def reset(self):
+        self.cursor = 0
+
+    def select(self, client: int) -> int | None:
+        available = self.state.available
+        if not available:
+            return None
+        self.cursor = (self.cursor + 1) % len(available)
+        return available.at(self.cursor)
+
+
+class LeastConnectionsStrategy(Strategy):
+    """Min-heap of `(load, server)`, with stale entries dropped lazily."""
+
+    name = "least_connections"
+
+    def reset(self):
+        self.heap: list[tuple[int, int]] = []
+
+    def select(self, client: int) -> int | None:
+        heap, state = self.heap, self.state
+        while heap:
+            load, server = heap[0]
+            if server in state.available and state.server_load[server] == load:
+                return server
+            heapq.heappop(heap)
+        return None
+
+    def on_add_server(self, server: int):
+        self.on_load_change(server)
+
+    def on_load_change(self, server: int):
+        if server in self.state.available:
+            heapq.heappush(self.heap, (int(self.state.server_load[server]), server))
+        if len(self.heap) > 4 * len(self.state.servers) + 64:
+            self.heap = [
+                (int(self.state.server_load[s]), s) for s in self.state.available
+            ]
+            heapq.heapify(self.heap)
+
+
+class PowerOfTwoStrategy(Strategy):
+    name = "power_of_two"
+
+    def select(self, client: int) -> int | None:
+        available = self.state.available
+        if not available:
+            return None
+        a, b = available.choice(), available.choice()
+        return a if self.state.server_load[a] <= self.state.server_load[b] else b
+
+
+class ConsistentHashStrategy(Strategy):
+    """Hash ring with virtual nodes; a full server defers to the next one clockwise."""
+
+    name = "consistent_hash"
+    replicas = 100
+
+    def reset(self):
+        self.ring: list[tuple[int, int]] = []
+
+    @staticmethod
+    def _hash(key: str) -> int:
+        return int.from_bytes(blake2b(key.encode(), digest_size=8).digest(), "big")
+
+    def on_add_server(self, server: int):
+        for replica in range(self.replicas):
+            insort(self.ring, (self._hash(f"{server}-{replica}"), server))
+
+    def on_remove_server(self, server: int):
+        self.ring = [point for point in self.ring if point[1] != server]
+
+    def select(self, client: int) -> int | None:
+        available = self.state.available
+        if not available:
+            return None
+        start = bisect(self.ring, (self._hash(str(client)), -1))
+        for i in range(len(self.ring)):
+            server = self.ring[(start + i) % len(self.ring)][1]
+            if server in available:
+                return server
+        return None
+
+
+STRATEGIES: dict[StrategyName, type[Strategy]] = {
+    strategy.name: strategy
+    for strategy in (
+        RandomStrategy,
+        RoundRobinStrategy,
+        LeastConnectionsStrategy,
+        PowerOfTwoStrategy,
+        ConsistentHashStrategy,
+    )
+}
+
+
+def make_strategy(name: StrategyName, state: ConnectionState) -> Strategy:
+    strategy = STRATEGIES[name](state)
+    strategy.reset()
+    for server in state.servers:
+        strategy.on_add_server(server)
+    return strategy
+
+
+def load_imbalance(loads: np.ndarray) -> float:
+    """Max over mean server load: 1.0 is perfectly balanced."""
+    mean = loads.mean() if len(loads) else 0
+    return float(loads.max() / mean) if mean else 1.0
@@ -0,0 +1,137 @@
+"""Save the whole simulation to a compact file and restore it in place.
+
+```shell
+python engine.py --steps 5000 --checkpoint-at 4999 --checkpoint warm.ckpt
+python engine.py --steps 20000 --resume-from warm.ckpt  # continues at step 5000
+```
+"""
+
+import gzip
+import pickle
+import random
+
+import numpy as np
+from balancing import make_strategy
+from settings import settings
+from variables import (
+    AUTOSCALER,
+    CLIENT_LIFETIMES,
+    CLIENT_QUEUE,
+    LOG_BUFFER,
+    SERVICE,
+    SIGNALS,
+    STATE,
+)
+
+FORMAT_VERSION = 1
+
+
+def save_checkpoint(path: str, step: int):
+    """Write the state after `step` (network, lifetimes, queue, signals, RNGs)."""
+    payload = {
+        "format": FORMAT_VERSION,
+        "step": step,
+        # pickled together, so references between them (e.g. the balancer's
+        # `state`) are kept
+        "state": STATE,
+        "lifetimes": CLIENT_LIFETIMES,
+        "queue": list(CLIENT_QUEUE),
+        "signals": SIGNALS,
+        "autoscaler": AUTOSCALER,
+        "service": SERVICE,
+        "events": list(LOG_BUFFER),
+        "random": random.getstate(),
+        "numpy_random": np.random.get_state(),
+    }
+    with gzip.open(path, "wb", compresslevel=6) as f:
+        pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def _copy_into(live, loaded, skip: tuple[str, ...] = ()):
+    names = getattr(type(live), "__slots__", None) or vars(loaded)
+    for name in names:
+        if name not in skip:
+            setattr(live, name, getattr(loaded, name))
+
+
+def load_checkpoint(path: str, seed: int | None = None) -> int:
+    """Restore a checkpoint into the live globals; returns the step it was taken at.
+
+    Everything is copied into the existing objects, since other modules hold
+    references to them. Settings may differ from the checkpoint's (that's how
+    experiments branch from one warm state), except the client pool and load
+    balancers, which define the state's shape: whatever is sized or seeded from
+    the settings is rebuilt from the current ones. A `seed` replaces the saved
+    random generators, to branch several runs off one checkpoint.
+    """
+    with gzip.open(path, "rb") as f:
+        payload = pickle.load(f)
+    if payload.get("format") != FORMAT_VERSION:
+        raise ValueError(f"{path} is not a version {FORMAT_VERSION} checkpoint")
+    state = payload["state"]
+    if (
+        state.client_names != STATE.client_names
+        or state.load_balancers != STATE.load_balancers
+    ):
+        raise ValueError(
+            f"{path} was taken with a different client pool or load balancers"
+        )
+
+    # network: `SERVERS` is an alias of `STATE.servers`, so refill that dict
+    _copy_into(STATE, state, skip=("servers", "balancer"))
+    STATE.servers.clear()
+    STATE.servers.update(state.servers)
+    resized = STATE.max_connections != settings.max_connections
+    if resized:
+        STATE.max_connections = settings.max_connections
+        STATE.available = type(STATE.available)()
+        for server in STATE.servers:
+            if (
+                STATE.server_load[server] < STATE.max_connections
+                and server not in STATE.draining
+            ):
+                STATE.available.add(server)
+    if type(state.balancer) is type(STATE.balancer) and not resized:
+        _copy_into(STATE.balancer, state.balancer, skip=("state",))
+    else:
+        # the balancer's index only covers the servers that were available
+        make_strategy(settings.balancing_strategy, STATE)
+
+    _copy_into(CLIENT_LIFETIMES, payload["lifetimes"])
+    CLIENT_QUEUE.clear()
+    CLIENT_QUEUE.extend(payload["queue"])
+
+    signals = payload["signals"]
+    SIGNALS.reset()
+    if (
+        signals.history.maxlen == SIGNALS.history.maxlen
+        and SIGNALS.ewmas.keys() <= signals.ewmas.keys()
+    ):
+        SIGNALS.history.extend(signals.history)
+        SIGNALS.sketch = signals.sketch
+        SIGNALS.ewmas.update((alpha, signals.ewmas[alpha]) for alpha in SIGNALS.ewmas)
+    else:
+        # a different window or new alphas: recompute from the saved pressures
+        for pressure in list(signals.history)[-SIGNALS.history.maxlen :]:
+            SIGNALS.update(pressure)
+
+    autoscaler = payload["autoscaler"]
+    if type(autoscaler) is type(AUTOSCALER):
+        _copy_into(AUTOSCALER, autoscaler, skip=("state", "signals"))
+    else:
+        AUTOSCALER.reset()
+    _copy_into(
+        SERVICE,
+        payload["service"],
+        skip=("discipline", "service_rate", "request_rate"),
+    )
+
+    LOG_BUFFER.clear()
+    LOG_BUFFER.events.extend(payload["events"])
+    random.setstate(payload["random"])
+    np.random.set_state(payload["numpy_random"])
+    if seed is not None:
+        random.seed(seed)
+        if settings.service_model:
+            SERVICE.rng = np.random.default_rng(random.getrandbits(64))
+    return payload["step"]
@@ -0,0 +1,271 @@
+"""Continuous-time, event-driven version of the simulation.
+
+Instead of advancing in whole steps, the engine pops the next event off a
+time-ordered calendar: an arrival, a departure, an autoscaler tick or a server
+finishing its spin-up. Nothing happens between events, and autoscaler ticks
+over a long-idle network are skipped, so sparse or bursty workloads cost time
+proportional to their events rather than to the simulated span.
+Clients, load balancers and servers live in the same `STATE` as in the step
+engine.
+
+```shell
+python des.py --until 10000 --seed 1
+python des.py --until 10000 --trace connections.csv  # see traces.py
+```
+"""
+
+import argparse
+import heapq
+import itertools
+import math
+import random
+import time
+from collections.abc import Iterable, Iterator
+from dataclasses import asdict, replace
+
+import numpy as np
+from balancing import load_imbalance
+from engine import A, StepMetrics, ƒ
+from eventlog import EventType
+from servers import (
+    add_server,
+    calculate_ewma,
+    calculate_server_pressure,
+    manage_servers,
+)
+from settings import settings
+from state import NO_ID
+from traces import read_trace
+from variables import (
+    AUTOSCALER,
+    CLIENT_QUEUE,
+    LOAD_BALANCERS,
+    LOG_BUFFER,
+    SIGNALS,
+    STATE,
+    reset_state,
+)
+
+ARRIVAL, DEPARTURE, AUTOSCALE, SERVER_READY = range(4)
+
+
+Arrival = tuple[float, float | None]  # time, lifetime (`None` to draw one)
+
+
+def poisson_arrivals(rate: float | None = None) -> Iterator[Arrival]:
+    """Arrival times of a Poisson process with `clients_per_step` arrivals per unit
+    time, or the sinusoidal rate of `engine.arrivals` (by thinning) if `SINUSOIDAL`."""
+    ø = settings.clients_per_step if rate is None else rate
+    peak = ø + A if settings.SINUSOIDAL else ø
+    if peak <= 0:
+        return
+    t = 0.0
+    while True:
+        t += random.expovariate(peak)
+        if not settings.SINUSOIDAL or random.random() * peak < max(
+            0.0, A * math.sin(2 * math.pi * ƒ * t) + ø
+        ):
+            yield t, None
+
+
+def trace_arrivals(path: str) -> Iterator[Arrival]:
+    """Arrivals streamed from a trace (see `traces.read_trace`), with times counted
+    from the first arrival and recorded lifetimes kept."""
+    start = None
+    for times, lifetimes in read_trace(path):
+        if not len(times):
+            continue
+        if start is None:
+            start = times[0]
+        yield from zip(
+            (times - start).tolist(),
+            lifetimes.tolist() if lifetimes is not None else itertools.repeat(None),
+        )
+
+
+class EventSimulation:
+    """Heap-ordered event calendar driving `STATE`.
+
+    Departures carry the session number of the connection they end, so a
+    departure scheduled for a client whose server was since removed (and who
+    may have reconnected) is recognised as stale and skipped. Waiting clients
+    are admitted as soon as capacity frees up. At most one server spins up at a
+    time, taking `server_spinup_delay` before it accepts clients.
+    """
+
+    def __init__(self, arrivals: Iterable[Arrival]):
+        self.calendar: list[tuple[float, int, int, int, int]] = []
+        self.sequence = itertools.count()
+        self.arrivals = iter(arrivals)
+        self.session = np.zeros(len(STATE.client_names), dtype=np.int64)
+        self.now = 0.0
+        self.spinning_up = False
+        self.next_lifetime: float | None = None  # of the scheduled arrival
+        self.idle_ticks = 0
+        self.until = math.inf
+        self.counts = {"arrivals": 0, "connected": 0, "refused": 0}
+
+    def schedule(self, at: float, kind: int, client: int = -1, session: int = 0):
+        heapq.heappush(self.calendar, (at, next(self.sequence), kind, client, session))
+
+    def schedule_next_arrival(self):
+        if (arrival := next(self.arrivals, None)) is not None:
+            self.next_lifetime = arrival[1]
+            self.schedule(arrival[0], ARRIVAL)
+
+    def full(self) -> bool:
+        """The admission rule of `add_client`: draining servers take no one new."""
+        return STATE.active - STATE.draining_load() >= STATE.serving_slots()
+
+    def connect(self, client: int, lifetime: float | None = None):
+        load_balancer = random.randrange(len(LOAD_BALANCERS))
+        STATE.connect(client, load_balancer)
+        LOG_BUFFER.log(EventType.CONNECTED, client, load_balancer)
+        if (server := STATE.balancer.select(client)) is not None:
+            STATE.assign(client, server)
+            LOG_BUFFER.log(EventType.ASSIGNED, client, load_balancer, server)
+        self.session[client] += 1
+        if lifetime is None:
+            lifetime = random.gauss(
+                settings.client_lifetime_mean, settings.client_lifetime_stddev
+            )
+        self.schedule(
+            self.now + max(0.0, lifetime), DEPARTURE, client, self.session[client]
+        )
+        self.counts["connected"] += 1
+
+    def admit_waiting(self):
+        while CLIENT_QUEUE and not self.full():
+            client = CLIENT_QUEUE.popleft()
+            LOG_BUFFER.log(EventType.FROM_QUEUE, client)
+            self.connect(client)
+
+    def on_arrival(self):
+        lifetime = self.next_lifetime
+        self.schedule_next_arrival()
+        self.counts["arrivals"] += 1
+        if not STATE.offline:
+            return
+        client = STATE.offline.choice()
+        # waiting clients are admitted whenever capacity frees up, so a non-empty
+        # queue always means the network is full
+        if self.full():
+            STATE.offline.discard(client)  # waiting, so not free to arrive again
+            CLIENT_QUEUE.append(client)
+            LOG_BUFFER.log(EventType.REFUSED, client)
+            self.counts["refused"] += 1
+        else:
+            self.connect(client, lifetime)
+
+    def on_departure(self, client: int, session: int):
+        if self.session[client] != session or not STATE.is_connected(client):
+            return
+        load_balancer, server = STATE.disconnect(client)
+        if server == NO_ID:
+            LOG_BUFFER.log(EventType.DISCONNECT_FAILED, client, load_balancer)
+        else:
+            LOG_BUFFER.log(EventType.UNASSIGNED, client, load_balancer, server)
+        LOG_BUFFER.log(EventType.DISCONNECTED, client, load_balancer)
+        self.admit_waiting()
+
+    def request_server(self):
+        if not self.spinning_up:
+            self.spinning_up = True
+            self.schedule(self.now + settings.server_spinup_delay, SERVER_READY)
+
+    def on_server_ready(self):
+        self.spinning_up = False
+        add_server()
+        self.admit_waiting()
+
+    def on_autoscale(self, tick: int) -> list[StepMetrics]:
+        # the step engine's autoscaler (`autoscale_policy`, `scale_down_mode`),
+        # with a tick's arrivals standing in for a step's
+        dropped = manage_servers(self.counts["arrivals"], scale_up=self.request_server)
+        self.admit_waiting()
+
+        metrics = StepMetrics(
+            step=tick,
+            queue_depth=len(CLIENT_QUEUE),
+            active_clients=STATE.active,
+            servers=len(STATE.servers),
+            pressure=calculate_server_pressure(),
+            ewma=calculate_ewma(settings.emwa_alpha),
+            imbalance=load_imbalance(STATE.loads()),
+            dropped=dropped,
+            scaling_pressure=SIGNALS.history[-1],
+            **self.counts,
+        )
+        self.counts = dict.fromkeys(self.counts, 0)
+        rows = [metrics]
+
+        # an empty network at its minimum size, with nothing but zeros left in the
+        # pressure window, evaluates identically until the next event: skip ahead
+        idle = not STATE.active and not self.spinning_up and not CLIENT_QUEUE
+        self.idle_ticks = self.idle_ticks + 1 if idle else 0
+        interval, skipped = settings.autoscale_interval, 0
+        if (
+            self.idle_ticks >= SIGNALS.history.maxlen
+            and len(STATE.servers) <= settings.min_servers
+        ):
+            next_event = self.calendar[0][0] if self.calendar else self.until
+            skipped = max(0, math.ceil((next_event - self.now) / interval) - 1)
+            skipped = min(skipped, int((self.until - self.now) // interval))
+            rows.extend(replace(metrics, step=tick + i) for i in range(1, skipped + 1))
+            for _ in range(min(skipped, settings.forecast_window)):
+                AUTOSCALER.observe(0)
+        self.schedule(
+            self.now + (skipped + 1) * interval, AUTOSCALE, tick + skipped + 1
+        )
+        return rows
+
+    def run(self, until: float) -> list[StepMetrics]:
+        """Process events up to time `until`, returning metrics per autoscaler tick."""
+        metrics = []
+        self.until = until
+        self.schedule_next_arrival()
+        self.schedule(settings.autoscale_interval, AUTOSCALE, 0)
+        while self.calendar and self.calendar[0][0] <= until:
+            self.now, _, kind, client, session = heapq.heappop(self.calendar)
+            # events are stamped with the autoscaler tick they lead up to
+            tick = math.ceil(self.now / settings.autoscale_interval) - 1
+            LOG_BUFFER.step = max(0, tick)
+            if kind == ARRIVAL:
+                self.on_arrival()
+            elif kind == DEPARTURE:
+                self.on_departure(client, session)
+            elif kind == AUTOSCALE:
+                metrics.extend(self.on_autoscale(client))
+            else:
+                self.on_server_ready()
+        return metrics
+
+
+def run_events(
+    until: float, seed: int | None = None, trace: str | None = None
+) -> list[StepMetrics]:
+    """Run the event-driven simulation from a fresh network until time `until`."""
+    if seed is not None:
+        random.seed(seed)
+    reset_state()
+    arrivals = trace_arrivals(trace) if trace else poisson_arrivals()
+    return EventSimulation(arrivals).run(until)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--until", type=float, default=settings.num_steps)
+    parser.add_argument("--seed", type=int)
+    parser.add_argument(
+        "--trace",
+        help="a .csv (with a 'time' column), .parquet, .npz or .npy arrival trace",
+    )
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    metrics = run_events(args.until, args.seed, args.trace)
+    elapsed = time.perf_counter() - start
+
+    print(f"simulated t={args.until:g} in {elapsed:.2f}s")
+    if metrics:
+        print(asdict(metrics[-1]))
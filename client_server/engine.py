@@ -0,0 +1,239 @@
+"""Headless simulation loop: no rendering, no pacing - as fast as the CPU allows."""
+
+import argparse
+import math
+import random
+import time
+from collections.abc import Sequence
+from dataclasses import asdict, dataclass, field
+
+import numpy as np
+from balancing import STRATEGIES, load_imbalance, make_strategy
+from checkpoint import load_checkpoint, save_checkpoint
+from network import add_random_client, update_client_lifetimes
+from recording import MetricsRecorder
+from servers import calculate_ewma, calculate_server_pressure, manage_servers
+from settings import settings
+from variables import (
+    CLIENT_LIFETIMES,
+    CLIENT_QUEUE,
+    LOG_BUFFER,
+    SERVERS,
+    SERVICE,
+    SIGNALS,
+    STATE,
+    TIMER,
+    reset_state,
+)
+
+A = 12
+ƒ = 4 / 5
+
+
+def arrivals(step: int) -> int:
+    ø = settings.clients_per_step
+    if not settings.SINUSOIDAL:
+        return ø
+    return max(0, int(A * np.sin(2 * np.pi * ƒ * step) + ø))
+
+
+@dataclass(slots=True)
+class StepMetrics:
+    step: int
+    arrivals: int
+    connected: int
+    refused: int
+    queue_depth: int
+    active_clients: int
+    servers: int
+    pressure: float
+    ewma: float
+    imbalance: float
+    dropped: int = 0  # clients disconnected by a scale-down
+    # pressure the autoscaler acted on (`pressure` is measured after scaling)
+    scaling_pressure: float = math.nan
+    # response times, in steps (NaN unless `settings.service_model`)
+    latency_p50: float = math.nan
+    latency_p95: float = math.nan
+    latency_p99: float = math.nan
+    # server ID -> its p50/p95/p99, for servers that got requests this step
+    server_latency: dict[int, tuple[float, ...]] = field(default_factory=dict)
+
+
+def add_clients(
+    n: int, lifetimes: Sequence[int | None] | None = None
+) -> tuple[int, int]:
+    """Make `n` connection attempts, returning `(connected, refused)`.
+
+    `lifetimes`, if given, holds one lifetime (or `None`, to draw one) per attempt.
+    """
+    connected = refused = 0
+    for i in range(n):
+        result = add_random_client(lifetimes[i] if lifetimes is not None else None)
+        if result:
+            connected += 1
+        elif result is False:
+            refused += 1
+    return connected, refused
+
+
+def step(step: int, lifetimes: Sequence[int | None] | None = None) -> StepMetrics:
+    """Advance one step; `lifetimes` replaces the synthetic arrivals (see traces.py)."""
+    LOG_BUFFER.step = step
+    with TIMER.step(step):
+        if lifetimes is not None:
+            n = len(lifetimes)
+        else:
+            n = settings.initial_clients if step == 0 else arrivals(step)
+        with TIMER.phase("arrivals"):
+            connected, refused = add_clients(n, lifetimes)
+        with TIMER.phase("lifetimes"):
+            update_client_lifetimes()
+        with TIMER.phase("service"):
+            latency = serve()
+        with TIMER.phase("autoscale"):
+            dropped = manage_servers(n)
+    return StepMetrics(
+        step=step,
+        arrivals=n,
+        connected=connected,
+        refused=refused,
+        queue_depth=len(CLIENT_QUEUE),
+        active_clients=len(CLIENT_LIFETIMES),
+        servers=len(SERVERS),
+        pressure=calculate_server_pressure(),
+        ewma=calculate_ewma(settings.emwa_alpha),
+        imbalance=load_imbalance(STATE.loads()),
+        dropped=dropped,
+        scaling_pressure=SIGNALS.history[-1],
+        latency_p50=latency[0],
+        latency_p95=latency[1],
+        latency_p99=latency[2],
+        server_latency=dict(SERVICE.per_server),
+    )
+
+
+def serve() -> tuple[float, float, float]:
+    """Run the service model over the current servers, if it is enabled."""
+    if not settings.service_model:
+        return (math.nan,) * 3
+    return SERVICE.step(list(SERVERS), STATE.loads())
+
+
+def run_headless(
+    num_steps: int | None = None,
+    seed: int | None = None,
+    recorder: MetricsRecorder | None = None,
+    resume_from: str | None = None,
+    checkpoint: tuple[str, int] | None = None,
+) -> list[StepMetrics]:
+    """Run the simulation without rendering, from a fresh network or a checkpoint.
+
+    When resuming, steps continue from the checkpoint's and a `seed` (if given)
+    reseeds from there, to branch several runs off one warmed-up state.
+    `checkpoint=(path, step)` saves the state after that step.
+    """
+    # seed first: resetting draws the service model's seed from `random`
+    if seed is not None:
+        random.seed(seed)
+    if resume_from is not None:
+        first_step = load_checkpoint(resume_from, seed) + 1
+    else:
+        reset_state()
+        first_step = 0
+    metrics = []
+    for i in range(first_step, num_steps or settings.num_steps):
+        metrics.append(step(i))
+        if recorder is not None:
+            recorder.record(metrics[-1])
+        if checkpoint is not None and i == checkpoint[1]:
+            save_checkpoint(checkpoint[0], i)
+    if recorder is not None:
+        recorder.close()
+    return metrics
+
+
+def compare_strategies(
+    num_steps: int | None = None, seed: int | None = None
+) -> dict[str, dict[str, float]]:
+    """Run every balancing strategy on the same seed and summarize load imbalance."""
+    summary = {}
+    try:
+        for name in STRATEGIES:
+            make_strategy(name, STATE)
+            imbalance = np.array([m.imbalance for m in run_headless(num_steps, seed)])
+            summary[name] = {
+                "mean": float(imbalance.mean()),
+                "p99": float(np.percentile(imbalance, 99)),
+                "max": float(imbalance.max()),
+            }
+    finally:
+        make_strategy(settings.balancing_strategy, STATE)
+    return summary
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--steps", type=int, default=settings.num_steps)
+    parser.add_argument("--seed", type=int)
+    parser.add_argument(
+        "--record",
+        metavar="PATH",
+        help="write per-step metrics to a .parquet file or a directory of .npz chunks",
+    )
+    parser.add_argument(
+        "--compare-strategies",
+        action="store_true",
+        help="report load imbalance for every balancing strategy",
+    )
+    parser.add_argument("--resume-from", metavar="PATH", help="start from a checkpoint")
+    parser.add_argument(
+        "--checkpoint", metavar="PATH", help="where to save a checkpoint"
+    )
+    parser.add_argument(
+        "--checkpoint-at",
+        type=int,
+        metavar="STEP",
+        help="save the checkpoint after this step (default: the last one)",
+    )
+    parser.add_argument(
+        "--profile-phases",
+        action="store_true",
+        help="time each phase of a step and print where the time goes",
+    )
+    args = parser.parse_args()
+
+    if args.compare_strategies:
+        for name, stats in compare_strategies(args.steps, args.seed).items():
+            print(f"{name:>18}: " + "  ".join(f"{k} {v:.3f}" for k, v in stats.items()))
+        raise SystemExit
+
+    TIMER.enabled |= args.profile_phases
+    start = time.perf_counter()
+    recorder = MetricsRecorder(args.record) if args.record else None
+    checkpoint = (
+        (
+            args.checkpoint,
+            args.steps - 1 if args.checkpoint_at is None else args.checkpoint_at,
+        )
+        if args.checkpoint
+        else None
+    )
+    metrics = run_headless(
+        args.steps, args.seed, recorder, args.resume_from, checkpoint
+    )
+    elapsed = time.perf_counter() - start
+
+    print(
+        f"{len(metrics)} steps in {elapsed:.2f}s ({len(metrics) / elapsed:,.0f} steps/s)"
+    )
+    print(asdict(metrics[-1]))
+    print(
+        f"server-steps: {sum(m.servers for m in metrics):,}  "
+        f"clients dropped: {sum(m.dropped for m in metrics):,}  "
+        f"refusals: {sum(m.refused for m in metrics):,}"
+    )
+    for name, mean, p95, share in TIMER.summary():
+        print(
+            f"{name:>10}: mean {1e6 * mean:8.1f}µs  p95 {1e6 * p95:8.1f}µs  {share:6.1%}"
+        )
@@ -0,0 +1,156 @@
+import json
+import struct
+from collections import deque
+from collections.abc import Iterator
+from enum import IntEnum
+from typing import NamedTuple
+
+import numpy as np
+from state import NO_ID, server_name
+
+
+class EventType(IntEnum):
+    REFUSED = 0
+    CONNECTED = 1
+    ASSIGNED = 2
+    FROM_QUEUE = 3
+    DISCONNECT_FAILED = 4
+    UNASSIGNED = 5
+    DISCONNECTED = 6
+    SERVER_UP = 7
+    SERVER_DOWN = 8
+    SERVER_DRAINING = 9
+
+
+MESSAGES = {
+    EventType.REFUSED: "⛔️ {client} connection refused: network full - queueing...",
+    EventType.CONNECTED: "🟢 {client} connected to {load_balancer}",
+    EventType.ASSIGNED: "... 🤝 {load_balancer} connected {client} to {server}",
+    EventType.FROM_QUEUE: "🟢 ⏱️ {client} connected from queue",
+    EventType.DISCONNECT_FAILED: "❌ {load_balancer} failed to disconnect {client} from server",
+    EventType.UNASSIGNED: "... 💤 {load_balancer} disconnected {client} from {server}",
+    EventType.DISCONNECTED: "🔘 {client} disconnected from {load_balancer}",
+    EventType.SERVER_UP: "🔺 Spun up server: {server}",
+    EventType.SERVER_DOWN: "🔻 Spun down server: {server}",
+    EventType.SERVER_DRAINING: "🔽 Draining server: {server}",
+}
+
+
+class Event(NamedTuple):
+    type: int
+    step: int
+    client: int = NO_ID
+    load_balancer: int = NO_ID
+    server: int = NO_ID
+
+
+# on-disk layout of the binary sink, readable back with `read_events`
+EVENT_DTYPE = np.dtype(
+    [
+        ("type", "<u1"),
+        ("step", "<i4"),
+        ("client", "<i4"),
+        ("load_balancer", "<i4"),
+        ("server", "<i4"),
+    ]
+)
+_RECORD = struct.Struct("<Biiii")
+
+
+class NDJSONSink:
+    def __init__(self, path: str):
+        self.file = open(path, "w", buffering=1 << 16)
+
+    def write(self, event: Event):
+        self.file.write(json.dumps(event._asdict()) + "\n")
+
+    def close(self):
+        self.file.close()
+
+
+class BinarySink:
+    def __init__(self, path: str):
+        self.file = open(path, "wb", buffering=1 << 16)
+
+    def write(self, event: Event):
+        self.file.write(_RECORD.pack(*event))
+
+    def close(self):
+        self.file.close()
+
+
+def open_sink(path: str) -> NDJSONSink | BinarySink:
+    """NDJSON for `.ndjson`/`.jsonl` paths, fixed-width binary records otherwise."""
+    if path.endswith((".ndjson", ".jsonl")):
+        return NDJSONSink(path)
+    return BinarySink(path)
+
+
+def read_events(path: str) -> np.ndarray:
+    """Load a binary event log as a structured array with `EVENT_DTYPE` fields."""
+    return np.fromfile(path, dtype=EVENT_DTYPE)
+
+
+class EventLog:
+    """Ring buffer of compact event records, formatted only when displayed.
+
+    Events are stamped with `step`, which the engine sets as each step starts.
+    Every event is also written to a sink at `sink_path`, if given, so the full
+    history survives the ring; the file is only created by the first event, so
+    a process that logs nothing leaves it alone.
+    """
+
+    def __init__(self, maxlen: int, sink_path: str | None = None):
+        self.events: deque[Event] = deque(maxlen=maxlen)
+        self.step = 0
+        self.sink_path = sink_path
+        self.sink: NDJSONSink | BinarySink | None = None
+        self.version = 0
+
+    def log(
+        self,
+        type: EventType,
+        client: int = NO_ID,
+        load_balancer: int = NO_ID,
+        server: int = NO_ID,
+    ):
+        event = Event(type, self.step, client, load_balancer, server)
+        self.events.append(event)
+        self.version += 1
+        if self.sink_path is not None:
+            if self.sink is None:
+                self.sink = open_sink(self.sink_path)
+            self.sink.write(event)
+
+    def clear(self):
+        self.events.clear()
+        self.version += 1
+
+    def close(self):
+        """Close the sink; later events are only kept in the ring."""
+        if self.sink is not None:
+            self.sink.close()
+        self.sink = self.sink_path = None
+
+    def __len__(self) -> int:
+        return len(self.events)
+
+    def __iter__(self) -> Iterator[Event]:
+        return iter(self.events)
+
+    def lines(self, client_names: list[str], load_balancers: list[str]) -> list[str]:
+        return [
+            format_event(event, client_names, load_balancers) for event in self.events
+        ]
+
+
+def format_event(
+    event: Event, client_names: list[str], load_balancers: list[str]
+) -> str:
+    return MESSAGES[event.type].format(
+        client=client_names[event.client] if event.client != NO_ID else "",
+        load_balancer=(
+            load_balancers[event.load_balancer] if event.load_balancer != NO_ID else ""
+        ),
+        server=server_name(event.server) if event.server != NO_ID else "",
+    )
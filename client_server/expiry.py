@@ -0,0 +1,75 @@
+import heapq
+from collections.abc import Iterator
+
+
+class ExpiryScheduler:
+    """Client lifetimes as a min-heap of expiry ticks.
+
+    Behaves like the old `{client: remaining_lifetime}` dict, but `expire()` only
+    touches clients that actually expire, so a tick costs O(churn · log n)
+    instead of O(active clients). Cancelled entries are dropped lazily.
+    """
+
+    __slots__ = ("tick", "version", "_heap", "_expiry")
+
+    def __init__(self):
+        self.tick = 0
+        self.version = 0
+        self._heap: list[tuple[int, int]] = []
+        self._expiry: dict[int, int] = {}
+
+    def __setitem__(self, client: int, lifetime: int):
+        expiry = self.tick + lifetime
+        self._expiry[client] = expiry
+        self.version += 1
+        heapq.heappush(self._heap, (expiry, client))
+
+    def __getitem__(self, client: int) -> int:
+        """Remaining lifetime of `client`, in ticks."""
+        return self._expiry[client] - self.tick
+
+    def __delitem__(self, client: int):
+        del self._expiry[client]
+        self.version += 1
+        # lazily-deleted entries are skipped by `expire`; compact if they pile up
+        if len(self._heap) > 2 * len(self._expiry) + 64:
+            self._heap = [(e, c) for c, e in self._expiry.items()]
+            heapq.heapify(self._heap)
+
+    def __contains__(self, client: object) -> bool:
+        return client in self._expiry
+
+    def __len__(self) -> int:
+        return len(self._expiry)
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._expiry)
+
+    def pop(self, client: int, default: int | None = None) -> int | None:
+        if client not in self._expiry:
+            return default
+        remaining = self[client]
+        del self[client]
+        return remaining
+
+    def items(self) -> Iterator[tuple[int, int]]:
+        return ((client, expiry - self.tick) for client, expiry in self._expiry.items())
+
+    def clear(self):
+        self.tick = 0
+        self._heap.clear()
+        self._expiry.clear()
+        self.version += 1
+
+    def expire(self) -> list[int]:
+        """Advance one tick, removing and returning the clients whose lifetime ran out."""
+        self.tick += 1
+        self.version += 1  # every remaining lifetime just changed
+        expired = []
+        heap, expiry = self._heap, self._expiry
+        while heap and heap[0][0] <= self.tick:
+            when, client = heapq.heappop(heap)
+            if expiry.get(client) == when:
+                del expiry[client]
+                expired.append(client)
+        return expired
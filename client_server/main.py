@@ -2,48 +2,65 @@ import threading
 
 import matplotlib.animation as animation
 import matplotlib.pyplot as plt
-import numpy as np
+from checkpoint import load_checkpoint
+from engine import add_clients, arrivals, serve
 from network import (
-    add_random_client,
     initialize_network,
     update_client_lifetimes,
 )
 from servers import manage_servers
 from settings import settings
+from snapshot import SNAPSHOTS, Snapshot
+from variables import LOG_BUFFER, TIMER
 from viz import (
+    NetworkRenderer,
     live_rich_console,
     visualize_network,
 )
 
-A = 12
-ƒ = 4 / 5
-ø = settings.clients_per_step
-
 if __name__ == "__main__":
+    first_step = (
+        load_checkpoint(settings.resume_from) + 1 if settings.resume_from else 0
+    )
     threading.Thread(target=live_rich_console, daemon=True).start()
 
     fig, ax = plt.subplots(figsize=(12, 8))
+    renderer = NetworkRenderer(ax) if settings.blit else None
 
     def animate(step):
-        if step == 0:
-            initialize_network(settings.initial_clients)
-        else:
-            for _ in range(
-                ø
-                if not settings.SINUSOIDAL
-                else int(A * np.sin(2 * np.pi * ƒ * step) + ø)
-            ):
-                add_random_client()
-
-        update_client_lifetimes()
-        visualize_network(step, ax)
-        manage_servers()
+        LOG_BUFFER.step = step
+        with TIMER.step(step):
+            with TIMER.phase("arrivals"):
+                n = settings.initial_clients if step == 0 else arrivals(step)
+                if step == 0:
+                    initialize_network(n)
+                else:
+                    add_clients(n)
+
+            with TIMER.phase("lifetimes"):
+                update_client_lifetimes()
+            with TIMER.phase("service"):
+                serve()
+            with TIMER.phase("render"):
+                artists = (
+                    renderer.update(step) if renderer else visualize_network(step, ax)
+                )
+            with TIMER.phase("autoscale"):
+                manage_servers(n)
+            with TIMER.phase("snapshot"):
+                SNAPSHOTS.publish(Snapshot.capture(step))
 
         if step == settings.num_steps - 1:
             initialize_network(settings.initial_clients, reset=settings.reset_clients)
+        return artists
 
     ani = animation.FuncAnimation(
-        fig, animate, frames=settings.num_steps, interval=settings.refresh_interval
+        fig,
+        animate,
+        init_func=(lambda: renderer.artists) if renderer else None,
+        frames=range(first_step, settings.num_steps),
+        interval=settings.refresh_interval,
+        blit=settings.blit,
     )
 
     plt.show()
@@ -0,0 +1,257 @@
+"""Monte Carlo replicas of the client_server model, advanced in lockstep with NumPy.
+
+Each replica is reduced to counts - active clients (bucketed by expiry tick),
+queue depth and server count - so a step costs a fixed number of array
+operations regardless of how many clients there are.
+
+```shell
+python montecarlo.py --replicas 1000 --steps 10000
+```
+"""
+
+import argparse
+import math
+import time
+from dataclasses import dataclass, field
+
+import numpy as np
+from autoscaling import ArrivalForecast
+from engine import arrivals
+from settings import settings
+
+METRICS = (
+    "active_clients",
+    "queue_depth",
+    "servers",
+    "pressure",
+    "refused",
+    "dropped",
+)
+
+
+def lifetime_pmf(mean: float, stddev: float) -> np.ndarray:
+    """P(lifetime = l) for l = 1..L of `max(1, int(random.gauss(mean, stddev)))`."""
+    if stddev <= 0:
+        pmf = np.zeros(max(1, int(mean)))
+        pmf[-1] = 1
+        return pmf
+
+    def cdf(x: float) -> float:
+        return 0.5 * (1 + math.erf((x - mean) / (stddev * math.sqrt(2))))
+
+    longest = max(1, math.ceil(mean + 8 * stddev))
+    # int() truncates toward zero, so everything below 2 becomes a lifetime of 1
+    pmf = np.array([cdf(2)] + [cdf(k + 1) - cdf(k) for k in range(2, longest + 1)])
+    return pmf / pmf.sum()
+
+
+@dataclass
+class MonteCarloResult:
+    replicas: int
+    mean: dict[str, np.ndarray]  # per step, across replicas
+    lower: dict[str, np.ndarray]  # 2.5th percentile per step
+    upper: dict[str, np.ndarray]  # 97.5th percentile per step
+    totals: dict[str, np.ndarray] = field(repr=False)  # per replica, whole run
+
+    def confidence_interval(self, name: str, z: float = 1.96) -> tuple[float, ...]:
+        """Mean of a per-replica total with its normal-approximation interval."""
+        values = self.totals[name]
+        mean = values.mean()
+        half_width = z * values.std(ddof=1) / math.sqrt(len(values))
+        return mean, mean - half_width, mean + half_width
+
+
+class Replicas:
+    """`R` copies of the simulation's state, reproducing `add_client`,
+    `update_client_lifetimes` and `manage_servers` on counts.
+
+    One approximation: the clients of the server `remove_server` kills (or
+    drains) are those of a random server, i.e. a binomial thinning of every
+    lifetime bucket with probability `1 / servers`, rather than the first (or
+    least loaded) server's exact clients. A draining server's clients are kept
+    in `drain_buckets` until they leave and the server is retired.
+    """
+
+    def __init__(self, n: int, seed: int | None = None):
+        self.rng = np.random.default_rng(seed)
+        self.pmf = lifetime_pmf(
+            settings.client_lifetime_mean, settings.client_lifetime_stddev
+        )
+        self.width = len(self.pmf) + 1  # ring of expiry ticks
+        self.buckets = np.zeros((n, self.width), dtype=np.int64)
+        self.drain_buckets = np.zeros((n, self.width), dtype=np.int64)
+        self.draining = np.zeros(n, dtype=bool)  # at most one server drains
+        self.active = np.zeros(n, dtype=np.int64)
+        self.queue = np.zeros(n, dtype=np.int64)
+        self.servers = np.full(n, settings.num_servers, dtype=np.int64)
+        self.tick = 0
+
+        window = settings.max_pressure_history
+        self.history = np.zeros((n, window))
+        self.ewma_sum = np.zeros(n)
+        self.count = 0
+        # arrivals are the same in every replica, so one forecast serves them all
+        self.forecast = (
+            ArrivalForecast() if settings.autoscale_policy == "forecast" else None
+        )
+
+    def serving_slots(self) -> np.ndarray:
+        return (self.servers - self.draining) * settings.max_connections
+
+    def add_clients(self, attempts: int) -> np.ndarray:
+        """Make `attempts` `add_random_client` calls per replica; returns refusals."""
+        pool, active, queue = settings.client_pool_size, self.active, self.queue
+        # clients on a draining server hold no slot on the serving ones
+        capacity = self.serving_slots() + self.drain_buckets.sum(axis=1)
+        free = np.maximum(capacity - active, 0)
+
+        # queued clients go first; if they don't all fit, every attempt re-queues one
+        from_queue = np.minimum(np.minimum(queue, attempts), free)
+        stuck = queue > free
+        refused = np.where(stuck, attempts - from_queue, 0)
+        remaining = np.where(stuck, 0, attempts - from_queue)
+        active_after_queue = active + from_queue
+
+        # then random offline clients; once the network is full the first refusal
+        # is queued and every later attempt just cycles it through the queue again
+        room = np.minimum(capacity, pool) - active_after_queue
+        from_pool = np.minimum(remaining, room.clip(0))
+        new_active = active_after_queue + from_pool
+        overflow = np.where(new_active < pool, remaining - from_pool, 0)
+        queued = np.minimum(overflow, 1)
+
+        self.queue += queued - from_queue
+        refused += overflow
+        self.active = new_active
+
+        connected = from_queue + from_pool
+        if connected.any():
+            lifetimes = self.rng.multinomial(connected, self.pmf)
+            slots = (self.tick + np.arange(1, len(self.pmf) + 1)) % self.width
+            self.buckets[:, slots] += lifetimes
+        return refused
+
+    def update_client_lifetimes(self):
+        self.tick += 1
+        slot = self.tick % self.width
+        self.active -= self.buckets[:, slot] + self.drain_buckets[:, slot]
+        self.buckets[:, slot] = 0
+        self.drain_buckets[:, slot] = 0
+
+    def manage_servers(self, arrivals: int) -> tuple[np.ndarray, np.ndarray]:
+        """Returns the pressure and the number of clients dropped per replica."""
+        capacity = self.serving_slots()
+        serving_active = self.active - self.drain_buckets.sum(axis=1)
+        pressure = np.divide(
+            serving_active, capacity, out=np.zeros(len(capacity)), where=capacity > 0
+        )
+
+        alpha, window = settings.emwa_alpha, self.history.shape[1]
+        slot = self.count % window
+        self.ewma_sum = alpha * pressure + (1 - alpha) * self.ewma_sum
+        if self.count >= window:
+            self.ewma_sum -= alpha * (1 - alpha) ** window * self.history[:, slot]
+        self.history[:, slot] = pressure
+        self.count += 1
+
+        if self.forecast is not None:
+            self.forecast.observe(arrivals)
+        retired = self.draining & ~self.drain_buckets.any(axis=1)
+        self.servers -= retired
+        self.draining &= ~retired
+
+        filled = min(self.count, window)
+        if settings.scaling_signal == "percentile":
+            signal = np.percentile(
+                self.history[:, :filled], settings.scaling_percentile, axis=1
+            )
+        else:
+            signal = self.ewma_sum / (1 - (1 - alpha) ** filled)
+        up = signal > settings.server_scale_up_threshold
+        if settings.scale_up_rate_threshold is not None and filled > 1:
+            oldest = self.history[:, self.count % window if filled == window else 0]
+            rate = (pressure - oldest) / (filled - 1)
+            up |= rate > settings.scale_up_rate_threshold
+        down = ~up & (signal < settings.server_scale_down_threshold)
+
+        serving = self.servers - self.draining
+        needed = (
+            self.forecast.servers_needed(settings.client_pool_size)
+            if self.forecast is not None
+            else None
+        )
+        if needed is not None:
+            # see `ForecastPolicy.decide`
+            up, down = needed > serving, needed < serving - 1
+        down &= serving > settings.min_servers
+
+        dropped = np.zeros(len(self.servers), dtype=np.int64)
+        if settings.scale_down_mode == "drain":
+            down &= ~self.draining
+        if down.any():
+            removed = self.rng.binomial(
+                self.buckets[down], (1 / self.servers[down])[:, None]
+            )
+            self.buckets[down] -= removed
+            if settings.scale_down_mode == "drain":
+                self.drain_buckets[down] += removed
+                self.draining |= down
+            else:
+                self.active[down] -= removed.sum(axis=1)
+                dropped[down] = removed.sum(axis=1)
+                self.servers -= down
+        self.servers += up.astype(np.int64)
+        return pressure, dropped
+
+    def step(self, step: int) -> dict[str, np.ndarray]:
+        attempts = settings.initial_clients if step == 0 else arrivals(step)
+        refused = self.add_clients(attempts)
+        self.update_client_lifetimes()
+        pressure, dropped = self.manage_servers(attempts)
+        return {
+            "active_clients": self.active,
+            "queue_depth": self.queue,
+            "servers": self.servers,
+            "pressure": pressure,
+            "refused": refused,
+            "dropped": dropped,
+        }
+
+
+def run_monte_carlo(
+    replicas: int = 1000, num_steps: int | None = None, seed: int | None = None
+) -> MonteCarloResult:
+    num_steps = num_steps or settings.num_steps
+    model = Replicas(replicas, seed)
+    mean = {name: np.empty(num_steps) for name in METRICS}
+    lower = {name: np.empty(num_steps) for name in METRICS}
+    upper = {name: np.empty(num_steps) for name in METRICS}
+    totals = {name: np.zeros(replicas) for name in METRICS}
+
+    for i in range(num_steps):
+        for name, values in model.step(i).items():
+            mean[name][i] = values.mean()
+            lower[name][i], upper[name][i] = np.percentile(values, (2.5, 97.5))
+            totals[name] += values
+
+    totals["server_steps"] = totals.pop("servers")
+    totals["refusals"] = totals.pop("refused")
+    for name in ("active_clients", "queue_depth", "pressure"):
+        totals[f"{name}_mean"] = totals.pop(name) / num_steps
+    return MonteCarloResult(replicas, mean, lower, upper, totals)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--replicas", type=int, default=1000)
+    parser.add_argument("--steps", type=int, default=settings.num_steps)
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    result = run_monte_carlo(args.replicas, args.steps, args.seed)
+    elapsed = time.perf_counter() - start
+    print(f"{args.replicas} replicas x {args.steps} steps in {elapsed:.1f}s")
+    for name in result.totals:
+        mean, lo, hi = result.confidence_interval(name)
+        print(f"{name:>19}: {mean:12.3f}  95% CI [{lo:.3f}, {hi:.3f}]")
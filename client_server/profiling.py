@@ -0,0 +1,140 @@
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Literal
+
+import numpy as np
+
+_DISABLED = nullcontext()
+
+
+class RollingHistogram:
+    """The last `window` samples, in a ring buffer."""
+
+    __slots__ = ("samples", "count")
+
+    def __init__(self, window: int):
+        self.samples = np.zeros(window)
+        self.count = 0
+
+    def add(self, value: float):
+        self.samples[self.count % len(self.samples)] = value
+        self.count += 1
+
+    @property
+    def window(self) -> np.ndarray:
+        return self.samples[: min(self.count, len(self.samples))]
+
+    def mean(self) -> float:
+        return float(self.window.mean()) if self.count else 0.0
+
+    def quantile(self, q: float) -> float:
+        return float(np.percentile(self.window, q)) if self.count else 0.0
+
+    def histogram(self, bins: int = 10) -> tuple[np.ndarray, np.ndarray]:
+        return np.histogram(self.window, bins=bins)
+
+
+class StepProfiler:
+    """cProfile (or pyinstrument) capture over steps `[start, stop)`."""
+
+    def __init__(
+        self,
+        start: int,
+        stop: int,
+        output: str,
+        backend: Literal["cprofile", "pyinstrument"] = "cprofile",
+    ):
+        self.start, self.stop, self.output = start, stop, output
+        self.backend = backend
+        self.profiler = None
+
+    def before_step(self, step: int):
+        if step == self.start and self.profiler is None:
+            if self.backend == "pyinstrument":
+                from pyinstrument import Profiler  # optional dependency
+
+                self.profiler = Profiler()
+                self.profiler.start()
+            else:
+                import cProfile
+
+                self.profiler = cProfile.Profile()
+                self.profiler.enable()
+
+    def after_step(self, step: int):
+        if step == self.stop - 1 and self.profiler is not None:
+            if self.backend == "pyinstrument":
+                self.profiler.stop()
+                with open(self.output, "w") as f:
+                    f.write(self.profiler.output_html())
+            else:
+                self.profiler.disable()
+                self.profiler.dump_stats(self.output)
+            self.profiler = None
+
+
+class PhaseTimer:
+    """Wall-clock time per phase of a step, kept in rolling histograms.
+
+    When disabled, `phase()` hands back one shared no-op context manager, so the
+    instrumented loop pays a single attribute check per phase.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = False,
+        window: int = 1000,
+        profiler: StepProfiler | None = None,
+    ):
+        self.enabled = enabled
+        self.window = window
+        self.profiler = profiler
+        self.phases: dict[str, RollingHistogram] = {}
+        self.steps = RollingHistogram(window)
+
+    def phase(self, name: str):
+        if not self.enabled:
+            return _DISABLED
+        return self._timed(name)
+
+    @contextmanager
+    def _timed(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            if (histogram := self.phases.get(name)) is None:
+                histogram = self.phases[name] = RollingHistogram(self.window)
+            histogram.add(time.perf_counter() - start)
+
+    def step(self, step: int):
+        """Wrap a whole step: times it and drives the profiler's capture window."""
+        if not self.enabled and self.profiler is None:
+            return _DISABLED
+        return self._step(step)
+
+    @contextmanager
+    def _step(self, step: int):
+        if self.profiler is not None:
+            self.profiler.before_step(step)
+        start = time.perf_counter() if self.enabled else 0.0
+        try:
+            yield
+        finally:
+            if self.enabled:
+                self.steps.add(time.perf_counter() - start)
+            if self.profiler is not None:
+                self.profiler.after_step(step)
+
+    def summary(self) -> tuple[tuple[str, float, float, float], ...]:
+        """`(phase, mean seconds, p95 seconds, share of step time)` per phase."""
+        total = self.steps.mean() or sum(h.mean() for h in self.phases.values())
+        return tuple(
+            (
+                name,
+                histogram.mean(),
+                histogram.quantile(95),
+                histogram.mean() / total if total else 0.0,
+            )
+            for name, histogram in self.phases.items()
+        )
@@ -0,0 +1,334 @@
+"""Record per-step metrics to disk, and replay a recording through the visualizations.
+
+```shell
+python engine.py --steps 100000 --record run/  # a directory of .npz chunks
+python engine.py --steps 100000 --record run.parquet
+python recording.py run/
+```
+"""
+
+import argparse
+import math
+import threading
+from dataclasses import dataclass, replace
+from pathlib import Path
+
+import numpy as np
+from service import QUANTILES
+from settings import settings
+from state import NO_ID
+from variables import LOAD_BALANCERS, SERVERS, SIGNALS, STATE
+
+COLUMNS = {
+    "step": np.int64,
+    "arrivals": np.int32,
+    "connected": np.int32,
+    "refused": np.int32,
+    "queue_depth": np.int64,
+    "active_clients": np.int64,
+    "servers": np.int32,
+    "pressure": np.float64,
+    "ewma": np.float64,
+    "imbalance": np.float64,
+    "dropped": np.int32,
+    "scaling_pressure": np.float64,
+    "latency_p50": np.float64,
+    "latency_p95": np.float64,
+    "latency_p99": np.float64,
+}
+
+
+def import_parquet():
+    """Import `pyarrow` (optional: only parquet files need it)."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    return pa, pq
+
+
+class MetricsRecorder:
+    """Columnar per-step metrics in preallocated buffers, written out in chunks.
+
+    Per-server loads and response times are ragged (the server set changes), so
+    they are kept flat - `server_ids`/`server_loads`/`server_latency` - with
+    `server_offsets` marking where each step starts. Paths ending in `.parquet` get one row group per chunk
+    (needs `pyarrow`); anything else is a directory of `.npz` chunks.
+    """
+
+    def __init__(self, path: str, chunk_steps: int = 4096):
+        self.path = path
+        self.chunk_steps = chunk_steps
+        self.columns = {
+            name: np.empty(chunk_steps, dtype=dtype) for name, dtype in COLUMNS.items()
+        }
+        self.lb_loads = np.empty((chunk_steps, len(LOAD_BALANCERS)), dtype=np.int64)
+        self.server_offsets = np.zeros(chunk_steps + 1, dtype=np.int64)
+        self.server_ids = np.empty(16 * chunk_steps, dtype=np.int32)
+        self.server_loads = np.empty(16 * chunk_steps, dtype=np.int64)
+        self.server_latency = np.empty((16 * chunk_steps, len(QUANTILES)))
+        self.size = 0
+        self.chunks = 0
+        self.writer = None
+        if not path.endswith(".parquet"):
+            Path(path).mkdir(parents=True, exist_ok=True)
+
+    def record(self, metrics):
+        """Append one step's `engine.StepMetrics` plus the current loads."""
+        i = self.size
+        for name, column in self.columns.items():
+            column[i] = getattr(metrics, name)
+        self.lb_loads[i] = STATE.lb_load
+
+        ids = list(SERVERS)
+        start = self.server_offsets[i]
+        end = start + len(ids)
+        if end > len(self.server_ids):
+            self.server_ids = np.resize(self.server_ids, 2 * end)
+            self.server_loads = np.resize(self.server_loads, 2 * end)
+            self.server_latency = np.resize(
+                self.server_latency, (2 * end, len(QUANTILES))
+            )
+        self.server_ids[start:end] = ids
+        self.server_loads[start:end] = STATE.server_load[ids]
+        if latency := metrics.server_latency:
+            missing = (math.nan,) * len(QUANTILES)
+            self.server_latency[start:end] = [latency.get(s, missing) for s in ids]
+        else:
+            self.server_latency[start:end] = math.nan
+        self.server_offsets[i + 1] = end
+
+        self.size += 1
+        if self.size == self.chunk_steps:
+            self.flush()
+
+    def flush(self):
+        if not self.size:
+            return
+        n, servers = self.size, self.server_offsets[self.size]
+        chunk = {name: column[:n] for name, column in self.columns.items()} | {
+            "lb_loads": self.lb_loads[:n],
+            "server_offsets": self.server_offsets[: n + 1],
+            "server_ids": self.server_ids[:servers],
+            "server_loads": self.server_loads[:servers],
+            "server_latency": self.server_latency[:servers],
+        }
+        if self.path.endswith(".parquet"):
+            self._write_parquet(chunk)
+        else:
+            np.savez(Path(self.path) / f"chunk-{self.chunks:05d}.npz", **chunk)
+        self.chunks += 1
+        self.size = 0
+
+    def _write_parquet(self, chunk: dict[str, np.ndarray]):
+        pa, pq = import_parquet()
+        steps, width = chunk["lb_loads"].shape
+        offsets = pa.array(chunk["server_offsets"].astype(np.int32))
+        lb_offsets = pa.array(np.arange(steps + 1, dtype=np.int32) * width)
+        table = pa.table(
+            {name: chunk[name] for name in COLUMNS}
+            | {
+                "lb_loads": pa.ListArray.from_arrays(
+                    lb_offsets, chunk["lb_loads"].ravel()
+                ),
+                "server_ids": pa.ListArray.from_arrays(offsets, chunk["server_ids"]),
+                "server_loads": pa.ListArray.from_arrays(
+                    offsets, chunk["server_loads"]
+                ),
+            }
+            | {
+                f"server_p{q}": pa.ListArray.from_arrays(
+                    offsets, chunk["server_latency"][:, j]
+                )
+                for j, q in enumerate(QUANTILES)
+            }
+        )
+        if self.writer is None:
+            self.writer = pq.ParquetWriter(self.path, table.schema)
+        self.writer.write_table(table)
+
+    def close(self):
+        self.flush()
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+
+
+@dataclass
+class Recording:
+    columns: dict[str, np.ndarray]
+    lb_loads: np.ndarray  # (steps, load balancers)
+    server_offsets: np.ndarray  # (steps + 1,) into server_ids / server_loads
+    server_ids: np.ndarray
+    server_loads: np.ndarray
+    server_latency: np.ndarray  # (servers over all steps, quantiles)
+
+    def __len__(self) -> int:
+        return len(self.lb_loads)
+
+    def servers(self, i: int) -> dict[int, int]:
+        """Server ID -> connected clients at the `i`-th recorded step."""
+        start, end = self.server_offsets[i], self.server_offsets[i + 1]
+        return dict(
+            zip(
+                self.server_ids[start:end].tolist(),
+                self.server_loads[start:end].tolist(),
+            )
+        )
+
+    def latencies(self, i: int) -> dict[int, tuple[float, ...]]:
+        """Server ID -> p50/p95/p99 response time at the `i`-th recorded step."""
+        start, end = self.server_offsets[i], self.server_offsets[i + 1]
+        return dict(
+            zip(
+                self.server_ids[start:end].tolist(),
+                map(tuple, self.server_latency[start:end].tolist()),
+            )
+        )
+
+
+def load_recording(path: str) -> Recording:
+    if path.endswith(".parquet"):
+        _, pq = import_parquet()
+        table = pq.read_table(path)
+
+        def flat(name):
+            array = table.column(name).combine_chunks()
+            return array.offsets.to_numpy(), array.values.to_numpy()
+
+        lb_offsets, lb_loads = flat("lb_loads")
+        server_offsets, server_ids = flat("server_ids")
+        return Recording(
+            columns={name: table.column(name).to_numpy() for name in COLUMNS},
+            lb_loads=lb_loads.reshape(len(lb_offsets) - 1, -1),
+            server_offsets=server_offsets.astype(np.int64),
+            server_ids=server_ids,
+            server_loads=flat("server_loads")[1],
+            server_latency=np.column_stack(
+                [flat(f"server_p{q}")[1] for q in QUANTILES]
+            ),
+        )
+
+    chunks = [np.load(chunk) for chunk in sorted(Path(path).glob("chunk-*.npz"))]
+    if not chunks:
+        raise FileNotFoundError(f"no recorded chunks in {path}")
+    # re-base each chunk's offsets onto the concatenated server arrays
+    offsets, base = [np.zeros(1, dtype=np.int64)], 0
+    for chunk in chunks:
+        offsets.append(chunk["server_offsets"][1:] + base)
+        base += chunk["server_offsets"][-1]
+    return Recording(
+        columns={
+            name: np.concatenate([chunk[name] for chunk in chunks]) for name in COLUMNS
+        },
+        lb_loads=np.concatenate([chunk["lb_loads"] for chunk in chunks]),
+        server_offsets=np.concatenate(offsets),
+        server_ids=np.concatenate([chunk["server_ids"] for chunk in chunks]),
+        server_loads=np.concatenate([chunk["server_loads"] for chunk in chunks]),
+        server_latency=np.concatenate([chunk["server_latency"] for chunk in chunks]),
+    )
+
+
+def replay_step(recording: Recording, i: int):
+    """Reshape `STATE` to match the `i`-th recorded step.
+
+    Only counts are recorded, so clients are stand-ins: the network is changed
+    as little as possible to reach the recorded server and load balancer loads,
+    which keeps nodes (and their laid-out positions) stable between frames.
+    Steps must be replayed in order from a fresh state. `SIGNALS` is fed the
+    pressure the autoscaler saw, as in the live run.
+    """
+    servers = recording.servers(i)
+    lb_loads = recording.lb_loads[i]
+
+    for server in [s for s in STATE.servers if s not in servers]:
+        for client in STATE.remove_server(server):
+            STATE.disconnect(client)
+    # server IDs are handed out in order, so spin up (and skip) until we reach them
+    while servers and STATE.next_server_id <= max(servers):
+        server = STATE.add_server()
+        if server.id not in servers:
+            STATE.remove_server(server.id)
+
+    for server, load in servers.items():
+        clients = STATE.servers[server].clients
+        while len(clients) > load:
+            STATE.disconnect(next(iter(clients)))
+    for load_balancer, load in enumerate(lb_loads):
+        if STATE.lb_load[load_balancer] > load:
+            on_lb = np.flatnonzero(STATE.client_lb == load_balancer)
+            # drop clients without a server first, so server loads are kept
+            on_lb = on_lb[
+                np.argsort(STATE.client_server[on_lb] != NO_ID, kind="stable")
+            ]
+            for client in on_lb[: STATE.lb_load[load_balancer] - load]:
+                STATE.disconnect(int(client))
+
+    for load_balancer, load in enumerate(lb_loads):
+        for _ in range(load - STATE.lb_load[load_balancer]):
+            STATE.connect(STATE.offline.at(0), load_balancer)
+    unassigned = iter(
+        np.flatnonzero((STATE.client_lb != NO_ID) & (STATE.client_server == NO_ID))
+    )
+    for server, load in servers.items():
+        for _ in range(load - len(STATE.servers[server])):
+            if (client := next(unassigned, None)) is None:
+                break
+            STATE.assign(int(client), server)
+
+    SIGNALS.update(float(recording.columns["scaling_pressure"][i]))
+
+
+if __name__ == "__main__":
+    import matplotlib.animation as animation
+    import matplotlib.pyplot as plt
+    from snapshot import SNAPSHOTS, Snapshot
+    from variables import reset_state
+    from viz import NetworkRenderer, live_rich_console, visualize_network
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("path", help="a recording directory or .parquet file")
+    args = parser.parse_args()
+
+    recording = load_recording(args.path)
+    reset_state()
+    STATE.reset(0)
+    threading.Thread(target=live_rich_console, daemon=True).start()
+
+    fig, ax = plt.subplots(figsize=(12, 8))
+    renderer = NetworkRenderer(ax) if settings.blit else None
+
+    def animate(i):
+        replay_step(recording, i)
+        columns = {name: values[i] for name, values in recording.columns.items()}
+        step = int(columns["step"])
+        artists = renderer.update(step) if renderer else visualize_network(step, ax)
+        latency = tuple(float(columns[f"latency_p{q}"]) for q in QUANTILES)
+        unmodelled = math.isnan(latency[-1])
+        missing = (math.nan,) * len(QUANTILES)
+        server_latency = recording.latencies(i)
+        # show what was recorded, not what the stand-in network recomputes
+        SNAPSHOTS.publish(
+            replace(
+                Snapshot.capture(step),
+                pressure=float(columns["pressure"]),
+                ewma=float(columns["ewma"]),
+                queue_depth=int(columns["queue_depth"]),
+                latency=() if unmodelled else latency,
+                server_p99=()
+                if unmodelled
+                else tuple(server_latency.get(s, missing)[-1] for s in SERVERS),
+            )
+        )
+        return artists
+
+    ani = animation.FuncAnimation(
+        fig,
+        animate,
+        init_func=(lambda: renderer.artists) if renderer else None,
+        frames=len(recording),
+        interval=settings.refresh_interval,
+        blit=settings.blit,
+        repeat=False,
+    )
+
+    plt.show()
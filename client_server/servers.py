@@ -1,31 +1,34 @@
-from collections import deque
+from collections.abc import Callable
 from typing import Annotated
 
+import autoscaling
+from eventlog import EventType
 from pydantic import Field
 from settings import settings
 from variables import (
+    AUTOSCALER,
     CLIENT_LIFETIMES,
     LOG_BUFFER,
-    NETWORK,
     SERVER_PRESSURE_HISTORY,
     SERVERS,
-    UPDATE_EVENT,
+    SIGNALS,
+    STATE,
 )
 
 ServerPressure = Annotated[float, Field(ge=0, le=1)]
 
 
 def calculate_server_pressure() -> ServerPressure:
-    max_connections = len(SERVERS) * settings.max_connections
-    return (
-        sum(len(SERVERS[server]) for server in SERVERS) / max_connections
-        if max_connections
-        else 0
-    )
+    """Load on the servers still taking new clients (draining ones don't count)."""
+    max_connections = STATE.serving_slots()
+    load = int(STATE.server_load.sum()) - STATE.draining_load()
+    return load / max_connections if max_connections else 0
 
 
 def calculate_ewma(alpha: float) -> ServerPressure:
     """Calculate the exponentially weighted moving average (EWMA) of the server pressures."""
+    if alpha in SIGNALS.ewmas:
+        return SIGNALS.ewma(alpha)
     if not SERVER_PRESSURE_HISTORY:
         return 0
     ewma = 0
@@ -37,31 +40,61 @@ def calculate_ewma(alpha: float) -> ServerPressure:
 
 
 def add_server():
-    new_server_id = f"Server_{chr(65 + len(SERVERS))}"
-    SERVERS[new_server_id] = deque(maxlen=settings.max_connections)
-    NETWORK.add_node(new_server_id, type="server")
-    LOG_BUFFER.append(f"🔺 Spun up server: {new_server_id}")
-    UPDATE_EVENT.set()
-
-
-def remove_server():
-    if len(SERVERS) > settings.min_servers:
-        server_to_remove = next(iter(SERVERS))
-        for client in list(SERVERS[server_to_remove]):
-            NETWORK.remove_node(client)
+    server = STATE.add_server()
+    LOG_BUFFER.log(EventType.SERVER_UP, server=server.id)
+
+
+def remove_server() -> int:
+    """Scale down by one server, returning how many clients were dropped.
+
+    With `scale_down_mode="drain"` the least loaded server stops taking new
+    clients and is only removed by `retire_drained_servers` once it is empty,
+    so no one is dropped; one server drains at a time.
+    """
+    if len(SERVERS) - len(STATE.draining) <= settings.min_servers:
+        return 0
+    if settings.scale_down_mode == "drain":
+        if not STATE.draining:
+            server = min(SERVERS, key=lambda server: STATE.server_load[server])
+            STATE.drain(server)
+            LOG_BUFFER.log(EventType.SERVER_DRAINING, server=server)
+        return 0
+    server_to_remove = next(iter(SERVERS.values()))
+    dropped = STATE.remove_server(server_to_remove.id)
+    for client in dropped:
+        STATE.disconnect(client)
+        if client in CLIENT_LIFETIMES:  # the event engine schedules departures itself
             del CLIENT_LIFETIMES[client]
-        NETWORK.remove_node(server_to_remove)
-        del SERVERS[server_to_remove]
-        LOG_BUFFER.append(f"🔻 Spun down server: {server_to_remove}")
-    UPDATE_EVENT.set()
+    LOG_BUFFER.log(EventType.SERVER_DOWN, server=server_to_remove.id)
+    return len(dropped)
+
+
+def retire_drained_servers():
+    for server in [server for server in STATE.draining if not SERVERS[server]]:
+        STATE.remove_server(server)
+        LOG_BUFFER.log(EventType.SERVER_DOWN, server=server)
+
+
+def scaling_signal() -> ServerPressure:
+    return autoscaling.scaling_signal(SIGNALS)
+
 
+def manage_servers(
+    arrivals: int | None = None, scale_up: Callable[[], None] = add_server
+) -> int:
+    """Run the autoscaler for one step, returning the number of clients dropped.
 
-def manage_servers():
-    pressure = calculate_server_pressure()
-    SERVER_PRESSURE_HISTORY.append(pressure)
-    moving_average_pressure = calculate_ewma(settings.emwa_alpha)
+    `scale_up` is called to add a server (the event engine delays it by the
+    spin-up time).
+    """
+    SIGNALS.update(calculate_server_pressure())
+    if arrivals is not None:
+        AUTOSCALER.observe(arrivals)
+    retire_drained_servers()
 
-    if moving_average_pressure > settings.server_scale_up_threshold:
-        add_server()
-    elif moving_average_pressure < settings.server_scale_down_threshold:
-        remove_server()
+    decision = AUTOSCALER.decide()
+    if decision > 0:
+        scale_up()
+    elif decision < 0:
+        return remove_server()
+    return 0
@@ -0,0 +1,96 @@
+from typing import Literal
+
+import numpy as np
+
+QUANTILES = (50, 95, 99)
+
+
+def _nearest_rank(
+    values: np.ndarray, starts: np.ndarray, counts: np.ndarray, q: float
+) -> np.ndarray:
+    """Per-segment nearest-rank `q`-th percentile of segment-sorted `values`."""
+    ranks = np.maximum(np.ceil(q / 100 * counts).astype(np.int64), 1) - 1
+    out = np.full(len(counts), np.nan)
+    nonempty = counts > 0
+    out[nonempty] = values[(starts + ranks)[nonempty]]
+    return out
+
+
+class ServiceModel:
+    """Requests from connected clients, served by each server within a step.
+
+    Every connected client sends Poisson requests at `request_rate` per step;
+    a server completes exponential work at `service_rate` per step. Time is
+    measured in steps.
+
+    - `fifo`: requests queue in arrival order. Completion times follow the
+      Lindley recursion `d_i = max(d_(i-1), t_i) + s_i`, computed for every
+      server at once as a segmented cumulative sum/maximum. Work still queued at
+      the end of a step is carried into the next one.
+    - `ps`: processor sharing, using the M/M/1-PS conditional mean response
+      time `s / (1 - ρ)`; a saturated server (`ρ >= 1`) reports `inf`.
+    """
+
+    def __init__(
+        self,
+        discipline: Literal["fifo", "ps"] = "fifo",
+        service_rate: float = 50,
+        request_rate: float = 4,
+        seed: int | None = None,
+    ):
+        self.discipline = discipline
+        self.service_rate = service_rate
+        self.request_rate = request_rate
+        self.rng = np.random.default_rng(seed)
+        self.backlog: dict[int, float] = {}  # server ID -> unfinished work, in steps
+        self.per_server: dict[int, tuple[float, ...]] = {}  # latest p50/p95/p99
+        self.overall: tuple[float, ...] = (np.nan,) * len(QUANTILES)
+
+    def reset(self, seed: int | None = None):
+        self.rng = np.random.default_rng(seed)
+        self.backlog.clear()
+        self.per_server.clear()
+        self.overall = (np.nan,) * len(QUANTILES)
+
+    def step(self, servers: list[int], loads: np.ndarray) -> tuple[float, ...]:
+        """Serve one step of requests; returns p50/p95/p99 response time overall."""
+        counts = self.rng.poisson(np.asarray(loads) * self.request_rate)
+        starts = np.concatenate([[0], np.cumsum(counts)[:-1]]).astype(np.int64)
+        segment = np.repeat(np.arange(len(servers)), counts)
+        # arrival times within the step, sorted within each server's segment
+        arrived = np.sort(self.rng.random(len(segment)) + segment) - segment
+        work = self.rng.exponential(1 / self.service_rate, len(segment))
+
+        if self.discipline == "ps":
+            rho = np.asarray(loads) * self.request_rate / self.service_rate
+            with np.errstate(divide="ignore"):
+                slowdown = np.where(rho < 1, 1 / (1 - np.minimum(rho, 1)), np.inf)
+            response = work * slowdown[segment]
+        else:
+            backlog = np.array([self.backlog.get(s, 0.0) for s in servers])
+            done = np.cumsum(work)
+            done -= np.concatenate([[0], done])[starts][segment]  # per segment
+            # max over j <= i of (t_j - work before j), per segment: offset each
+            # segment above everything before it so one running max suffices
+            slack = arrived - (done - work)
+            spread = np.ptp(slack) + 1 if len(slack) else 0
+            latest = np.maximum.accumulate(slack + segment * spread) - segment * spread
+            finished = done + np.maximum(backlog[segment], latest)
+            response = finished - arrived
+
+            leftover = np.maximum(backlog - 1, 0)
+            nonempty = counts > 0
+            last = (starts + counts - 1)[nonempty]
+            leftover[nonempty] = np.maximum(finished[last] - 1, 0)
+            self.backlog = dict(zip(servers, leftover.tolist()))
+
+        ordered = response[np.lexsort((response, segment))]
+        per_server = [_nearest_rank(ordered, starts, counts, q) for q in QUANTILES]
+        self.per_server = dict(zip(servers, zip(*(p.tolist() for p in per_server))))
+        total = np.array([len(response)])
+        overall = np.sort(response)
+        self.overall = tuple(
+            float(_nearest_rank(overall, np.zeros(1, dtype=np.int64), total, q)[0])
+            for q in QUANTILES
+        )
+        return self.overall
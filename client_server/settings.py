@@ -1,3 +1,5 @@
+from typing import Literal
+
 from pydantic import Field
 from pydantic_settings import BaseSettings
 
@@ -13,6 +15,9 @@ class DemoSettings(BaseSettings):
     reset_clients: bool = Field(
         False, description="Whether to reset all clients after all steps"
     )
+    resume_from: str | None = Field(
+        None, description="Start the animation from a checkpoint (see checkpoint.py)"
+    )
 
     num_servers: int = Field(5, description="Number of servers")
     min_servers: int = Field(1, description="Minimum number of servers")
@@ -28,9 +33,60 @@ class DemoSettings(BaseSettings):
     emwa_alpha: float = Field(
         0.5, description="Exponential moving average alpha value for pressure"
     )
+    signal_alphas: list[float] = Field(
+        [0.1, 0.9], description="Extra EWMA alpha values to track for pressure"
+    )
+    pressure_sketch_bins: int = Field(
+        100, description="Bins in the windowed pressure percentile sketch"
+    )
+    scaling_signal: Literal["ewma", "percentile"] = Field(
+        "ewma", description="Pressure signal compared against the scaling thresholds"
+    )
+    scaling_percentile: float = Field(
+        95, description="Percentile of windowed pressure used by the percentile signal"
+    )
+    scale_up_rate_threshold: float | None = Field(
+        None, description="Scale up early when pressure rises faster than this per step"
+    )
+    autoscale_policy: Literal["threshold", "forecast"] = Field(
+        "threshold",
+        description="threshold: react to the pressure signal; forecast: scale ahead "
+        "of the detected arrival period",
+    )
+    forecast_window: int = Field(
+        200, description="Steps of arrivals the forecast policy looks back over"
+    )
+    forecast_horizon: int = Field(
+        5, description="Steps ahead the forecast policy provisions for"
+    )
+    scale_down_mode: Literal["kill", "drain"] = Field(
+        "kill",
+        description="kill: remove the first server and drop its clients; drain: stop "
+        "sending clients to the least loaded server and remove it once empty",
+    )
+    autoscale_interval: float = Field(
+        1.0,
+        description="Time between autoscaler evaluations in the event-driven engine",
+    )
+    server_spinup_delay: float = Field(
+        0.0,
+        description="Time a new server takes to accept clients (event-driven engine)",
+    )
     max_connections: int = Field(
         10, description="Maximum number of connections per server"
     )
+    service_model: bool = Field(
+        False, description="Simulate requests to get per-step response time percentiles"
+    )
+    service_discipline: Literal["fifo", "ps"] = Field(
+        "fifo", description="Server queueing: first-in-first-out or processor sharing"
+    )
+    service_rate: float = Field(
+        50, description="Requests a server completes per step, on average"
+    )
+    request_rate: float = Field(
+        4, description="Requests a connected client sends per step, on average"
+    )
     client_pool_size: int = Field(50, description="Number of clients in the pool")
     client_lifetime_mean: int = Field(
         10, description="Average connection lifetime for clients"
@@ -40,11 +96,24 @@ class DemoSettings(BaseSettings):
     )
     SINUSOIDAL: bool = Field(False, description="Whether to add clients sinusoidally")
     LOG_TAIL: int = Field(40, description="Number of log entries to display")
+    event_log_path: str | None = Field(
+        None,
+        description="Write every event here (.ndjson/.jsonl, otherwise binary records)",
+    )
+    dashboard_fps: float = Field(
+        10, description="Maximum dashboard redraws per second (bursts are coalesced)"
+    )
+    dashboard_max_rows: int = Field(
+        50, description="Maximum rows shown in the client and server panels"
+    )
 
     server_node_size: int = Field(700, description="Size of server nodes")
     client_node_size: int = Field(100, description="Size of client nodes")
 
     num_load_balancers: int = Field(2, description="Number of load balancers")
+    balancing_strategy: Literal[
+        "random", "round_robin", "least_connections", "power_of_two", "consistent_hash"
+    ] = Field("random", description="How load balancers pick a server for a client")
     load_balancer_node_size: int = Field(500, description="Size of load balancer nodes")
     load_balancer_color: str = Field(
         "orange", description="Color of load balancer nodes"
@@ -53,6 +122,29 @@ class DemoSettings(BaseSettings):
     refresh_interval: int = Field(
         1000, description="Refresh interval for the animation"
     )
+    blit: bool = Field(
+        True, description="Update persistent artists instead of redrawing each frame"
+    )
+    show_client_labels: bool = Field(True, description="Whether to label client nodes")
+    layout_iterations: int = Field(
+        10, description="Spring layout iterations used to place new nodes"
+    )
+
+    profile_phases: bool = Field(
+        False, description="Time each phase of a step (arrivals, lifetimes, ...)"
+    )
+    profile_window: int = Field(
+        1000, description="Number of recent steps kept in the phase timing histograms"
+    )
+    profile_steps: tuple[int, int] | None = Field(
+        None, description="Capture a profile over steps [start, stop), e.g. [100, 200]"
+    )
+    profiler: Literal["cprofile", "pyinstrument"] = Field(
+        "cprofile", description="Profiler used for the profile_steps capture"
+    )
+    profile_output: str = Field(
+        "profile.prof", description="Where the profile_steps capture is written"
+    )
 
 
 settings = DemoSettings()
@@ -0,0 +1,108 @@
+from collections import deque
+
+import numpy as np
+
+
+class WindowedEWMA:
+    """Bias-corrected EWMA over the last `window` values, updated in O(1).
+
+    Equal to walking the whole window on every call (the old `calculate_ewma`):
+    the value leaving the window has its (tiny) weight subtracted back out.
+    """
+
+    __slots__ = ("alpha", "window", "_sum", "_count")
+
+    def __init__(self, alpha: float, window: int):
+        self.alpha = alpha
+        self.window = window
+        self.reset()
+
+    def reset(self):
+        self._sum = 0.0
+        self._count = 0
+
+    def update(self, value: float, dropped: float | None = None):
+        decay = 1 - self.alpha
+        self._sum = self.alpha * value + decay * self._sum
+        if dropped is not None:
+            self._sum -= self.alpha * decay**self.window * dropped
+        else:
+            self._count += 1
+
+    @property
+    def value(self) -> float:
+        if not self._count:
+            return 0
+        return self._sum / (1 - (1 - self.alpha) ** self._count)
+
+
+class WindowedHistogram:
+    """Fixed-bin quantile sketch over the last `window` values in `[0, 1]`.
+
+    Updates are O(1); quantiles are accurate to within one bin width.
+    """
+
+    __slots__ = ("bins", "counts", "total")
+
+    def __init__(self, bins: int = 100):
+        self.bins = bins
+        self.reset()
+
+    def reset(self):
+        self.counts = np.zeros(self.bins, dtype=np.int64)
+        self.total = 0
+
+    def _bin(self, value: float) -> int:
+        return min(max(int(value * self.bins), 0), self.bins - 1)
+
+    def update(self, value: float, dropped: float | None = None):
+        self.counts[self._bin(value)] += 1
+        if dropped is not None:
+            self.counts[self._bin(dropped)] -= 1
+        else:
+            self.total += 1
+
+    def quantile(self, q: float) -> float:
+        """Upper edge of the bin holding the `q`-th quantile (`q` in `[0, 100]`)."""
+        if not self.total:
+            return 0
+        rank = max(1, int(np.ceil(q / 100 * self.total)))
+        return (int(np.searchsorted(np.cumsum(self.counts), rank)) + 1) / self.bins
+
+
+class PressureSignals:
+    """Server pressure history plus the signals derived from it, kept incrementally."""
+
+    def __init__(self, history: deque, alphas: list[float], bins: int = 100):
+        self.history = history
+        self.ewmas = {alpha: WindowedEWMA(alpha, history.maxlen) for alpha in alphas}
+        self.sketch = WindowedHistogram(bins)
+        self.version = 0
+
+    def reset(self):
+        self.version += 1
+        self.history.clear()
+        self.sketch.reset()
+        for ewma in self.ewmas.values():
+            ewma.reset()
+
+    def update(self, pressure: float):
+        self.version += 1
+        history = self.history
+        dropped = history[0] if len(history) == history.maxlen else None
+        history.append(pressure)
+        self.sketch.update(pressure, dropped)
+        for ewma in self.ewmas.values():
+            ewma.update(pressure, dropped)
+
+    def ewma(self, alpha: float) -> float:
+        return self.ewmas[alpha].value
+
+    def percentile(self, q: float) -> float:
+        return self.sketch.quantile(q)
+
+    def rate(self) -> float:
+        """Average change in pressure per step across the window."""
+        if len(self.history) < 2:
+            return 0
+        return (self.history[-1] - self.history[0]) / (len(self.history) - 1)
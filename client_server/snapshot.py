@@ -0,0 +1,117 @@
+import heapq
+import math
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from operator import itemgetter
+
+from eventlog import Event
+from servers import calculate_ewma, calculate_server_pressure
+from settings import settings
+from variables import (
+    CLIENT_LIFETIMES,
+    CLIENT_QUEUE,
+    LOAD_BALANCERS,
+    LOG_BUFFER,
+    SERVERS,
+    SERVICE,
+    SIGNALS,
+    STATE,
+    TIMER,
+    UPDATE_EVENT,
+)
+
+
+@dataclass(frozen=True, slots=True)
+class Snapshot:
+    """Everything the dashboard shows, copied out of the simulation at one step."""
+
+    step: int
+    taken_at: datetime
+    active_clients: int
+    server_status: tuple[tuple[str, int], ...]  # (name, connected clients)
+    latency: tuple[float, ...]  # p50/p95/p99 response time, if modelled
+    server_p99: tuple[float, ...]  # per server, in `server_status` order
+    load_balancer_status: tuple[tuple[str, int], ...]
+    longest_lived: tuple[tuple[int, int], ...]  # top (client, remaining lifetime)
+    pressure: float
+    ewma: float
+    percentile: float
+    trend: float
+    queue_depth: int
+    events: tuple[Event, ...]
+    phase_times: tuple[tuple[str, float, float, float], ...]  # see PhaseTimer.summary
+    # mutation counters at capture time, so readers can tell what changed
+    state_version: int
+    lifetimes_version: int
+    signals_version: int
+    queue_version: int
+    log_version: int
+
+    @classmethod
+    def capture(cls, step: int) -> "Snapshot":
+        return cls(
+            step=step,
+            taken_at=datetime.now(UTC),
+            active_clients=STATE.active,
+            server_status=tuple(
+                (server.name, len(server)) for server in SERVERS.values()
+            ),
+            latency=SERVICE.overall if settings.service_model else (),
+            server_p99=(
+                tuple(
+                    SERVICE.per_server.get(server, (math.nan,) * 3)[2]
+                    for server in SERVERS
+                )
+                if settings.service_model
+                else ()
+            ),
+            load_balancer_status=tuple(zip(LOAD_BALANCERS, STATE.lb_load.tolist())),
+            longest_lived=tuple(
+                heapq.nlargest(
+                    settings.dashboard_max_rows,
+                    CLIENT_LIFETIMES.items(),
+                    key=itemgetter(1),
+                )
+            ),
+            pressure=calculate_server_pressure(),
+            ewma=calculate_ewma(settings.emwa_alpha),
+            percentile=SIGNALS.percentile(settings.scaling_percentile),
+            trend=SIGNALS.rate(),
+            queue_depth=len(CLIENT_QUEUE),
+            events=tuple(LOG_BUFFER),
+            phase_times=TIMER.summary() if TIMER.enabled else (),
+            state_version=STATE.version,
+            lifetimes_version=CLIENT_LIFETIMES.version,
+            signals_version=SIGNALS.version,
+            queue_version=CLIENT_QUEUE.version,
+            log_version=LOG_BUFFER.version,
+        )
+
+
+class SnapshotBuffer:
+    """Double buffer of immutable snapshots.
+
+    The simulation fills the back slot and then flips `front` - a single
+    reference assignment, atomic under the GIL - so the dashboard reads the
+    latest complete snapshot without locking, and the simulation never waits
+    on a redraw.
+    """
+
+    def __init__(self):
+        self.slots: list[Snapshot | None] = [None, None]
+        self.front_index = 0
+        self.sequence = 0  # number of snapshots published
+
+    @property
+    def front(self) -> Snapshot | None:
+        return self.slots[self.front_index]
+
+    def publish(self, snapshot: Snapshot):
+        back = 1 - self.front_index
+        self.slots[back] = snapshot
+        self.front_index = back
+        self.sequence += 1
+        UPDATE_EVENT.set()
+
+
+SNAPSHOTS = SnapshotBuffer()
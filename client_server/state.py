@@ -0,0 +1,274 @@
+import random
+from collections import deque
+from string import ascii_uppercase
+
+import networkx as nx
+import numpy as np
+
+NO_ID = -1
+
+
+def server_name(server_id: int) -> str:
+    letters = ""
+    n = server_id + 1
+    while n:
+        n, r = divmod(n - 1, 26)
+        letters = ascii_uppercase[r] + letters
+    return f"Server_{letters}"
+
+
+class VersionedDeque(deque):
+    """`deque` that counts its mutations, so readers can tell when it changed."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.version = 0
+
+    def append(self, x):
+        super().append(x)
+        self.version += 1
+
+    def appendleft(self, x):
+        super().appendleft(x)
+        self.version += 1
+
+    def popleft(self):
+        self.version += 1
+        return super().popleft()
+
+    def clear(self):
+        super().clear()
+        self.version += 1
+
+
+class IndexedSet:
+    """Set of small non-negative ints with O(1) add, discard and random choice.
+
+    Members live in a dense array (removal swaps in the last member) and a
+    position array maps each member back to its slot.
+    """
+
+    __slots__ = ("_items", "_pos", "_size")
+
+    def __init__(self, capacity: int = 16, full: bool = False):
+        capacity = max(capacity, 1)
+        self._items = np.arange(capacity, dtype=np.int64)
+        self._pos = np.arange(capacity) if full else np.full(capacity, NO_ID)
+        self._size = capacity if full else 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, x: int) -> bool:
+        return 0 <= x < len(self._pos) and self._pos[x] != NO_ID
+
+    def __iter__(self):
+        return iter(self._items[: self._size].tolist())
+
+    def add(self, x: int):
+        if x >= len(self._pos):
+            capacity = max(x + 1, 2 * len(self._pos))
+            self._pos = np.concatenate(
+                [self._pos, np.full(capacity - len(self._pos), NO_ID)]
+            )
+            self._items = np.resize(self._items, capacity)
+        elif self._pos[x] != NO_ID:
+            return
+        self._items[self._size] = x
+        self._pos[x] = self._size
+        self._size += 1
+
+    def discard(self, x: int):
+        if x not in self:
+            return
+        i = self._pos[x]
+        last = self._items[self._size - 1]
+        self._items[i] = last
+        self._pos[last] = i
+        self._pos[x] = NO_ID
+        self._size -= 1
+
+    def at(self, i: int) -> int:
+        return int(self._items[i])
+
+    def choice(self) -> int:
+        if not self._size:
+            raise IndexError("choice from an empty IndexedSet")
+        return int(self._items[random.randrange(self._size)])
+
+
+class Server:
+    __slots__ = ("id", "name", "clients")
+
+    def __init__(self, id: int, name: str):
+        self.id = id
+        self.name = name
+        self.clients: set[int] = set()
+
+    def __len__(self) -> int:
+        return len(self.clients)
+
+    def __repr__(self) -> str:
+        return f"Server({self.name!r}, clients={len(self.clients)})"
+
+
+class ConnectionState:
+    """Source of truth for who is connected where, keyed by integer IDs.
+
+    Clients and load balancers are indexed by their position in the pool;
+    servers get a fresh ID when spun up. The networkx graph is only a view,
+    built on demand for rendering.
+    """
+
+    __slots__ = (
+        "client_names",
+        "load_balancers",
+        "client_lb",
+        "client_server",
+        "offline",
+        "lb_load",
+        "server_load",
+        "servers",
+        "available",
+        "draining",
+        "max_connections",
+        "balancer",
+        "active",
+        "next_server_id",
+        "version",
+    )
+
+    def __init__(
+        self, client_names: list[str], load_balancers: list[str], max_connections: int
+    ):
+        self.client_names = client_names
+        self.load_balancers = load_balancers
+        self.max_connections = max_connections
+        self.servers: dict[int, Server] = {}
+        self.balancer = None  # set by `balancing.Strategy`
+        self.version = 0  # bumped on every change, for readers to diff against
+        self.reset()
+
+    def reset(self, num_servers: int = 0):
+        n = len(self.client_names)
+        self.client_lb = np.full(n, NO_ID, dtype=np.int32)
+        self.client_server = np.full(n, NO_ID, dtype=np.int32)
+        self.offline = IndexedSet(n, full=True)
+        self.lb_load = np.zeros(len(self.load_balancers), dtype=np.int64)
+        self.server_load = np.zeros(max(16, 2 * num_servers), dtype=np.int64)
+        self.servers.clear()
+        self.available = IndexedSet()  # servers below `max_connections`
+        self.draining: set[int] = set()  # taking no new clients, removed once empty
+        self.active = 0
+        self.next_server_id = 0
+        self.version += 1
+        if self.balancer:
+            self.balancer.reset()
+        for _ in range(num_servers):
+            self.add_server()
+
+    def is_connected(self, client: int) -> bool:
+        return self.client_lb[client] != NO_ID
+
+    def connect(self, client: int, load_balancer: int):
+        self.client_lb[client] = load_balancer
+        self.offline.discard(client)
+        self.lb_load[load_balancer] += 1
+        self.active += 1
+        self.version += 1
+
+    def assign(self, client: int, server: int):
+        self.client_server[client] = server
+        self.server_load[server] += 1
+        self.servers[server].clients.add(client)
+        self.version += 1
+        if self.server_load[server] >= self.max_connections:
+            self.available.discard(server)
+        if self.balancer:
+            self.balancer.on_load_change(server)
+
+    def disconnect(self, client: int) -> tuple[int, int]:
+        """Drop a client in O(1), returning the `(load_balancer, server)` it was on."""
+        load_balancer = int(self.client_lb[client])
+        server = int(self.client_server[client])
+        if server != NO_ID:
+            self.server_load[server] -= 1
+            self.servers[server].clients.discard(client)
+            self.client_server[client] = NO_ID
+            if (
+                self.server_load[server] < self.max_connections
+                and server not in self.draining
+            ):
+                self.available.add(server)
+            if self.balancer:
+                self.balancer.on_load_change(server)
+        self.lb_load[load_balancer] -= 1
+        self.client_lb[client] = NO_ID
+        self.offline.add(client)
+        self.active -= 1
+        self.version += 1
+        return load_balancer, server
+
+    def add_server(self) -> Server:
+        server_id = self.next_server_id
+        self.next_server_id += 1
+        if server_id >= len(self.server_load):
+            self.server_load = np.concatenate(
+                [self.server_load, np.zeros_like(self.server_load)]
+            )
+        server = self.servers[server_id] = Server(server_id, server_name(server_id))
+        self.version += 1
+        if self.max_connections > 0:
+            self.available.add(server_id)
+        if self.balancer:
+            self.balancer.on_add_server(server_id)
+        return server
+
+    def remove_server(self, server_id: int) -> list[int]:
+        """Remove a server, returning the clients it was serving (still connected)."""
+        server = self.servers.pop(server_id)
+        clients = list(server.clients)
+        self.client_server[clients] = NO_ID
+        self.server_load[server_id] = 0
+        self.available.discard(server_id)
+        self.draining.discard(server_id)
+        self.version += 1
+        if self.balancer:
+            self.balancer.on_remove_server(server_id)
+        return clients
+
+    def drain(self, server_id: int):
+        """Stop sending new clients to a server; its current clients stay."""
+        self.draining.add(server_id)
+        self.available.discard(server_id)
+        self.version += 1
+
+    def serving_slots(self) -> int:
+        """Connection slots on servers that take new clients (i.e. not draining)."""
+        return (len(self.servers) - len(self.draining)) * self.max_connections
+
+    def draining_load(self) -> int:
+        if not self.draining:
+            return 0
+        return int(self.server_load[list(self.draining)].sum())
+
+    def loads(self) -> np.ndarray:
+        """Connected-client counts of the current servers, in `servers` order."""
+        return self.server_load[list(self.servers)]
+
+    def network(self) -> nx.MultiGraph:
+        """Build a networkx view of the current connections (for rendering)."""
+        graph = nx.MultiGraph()
+        graph.add_nodes_from(self.load_balancers, type="load_balancer")
+        graph.add_nodes_from(
+            (server.name for server in self.servers.values()), type="server"
+        )
+        clients = np.flatnonzero(self.client_lb != NO_ID)
+        for client in clients:
+            name = self.client_names[client]
+            load_balancer = self.load_balancers[self.client_lb[client]]
+            graph.add_node(name, type="client")
+            graph.add_edge(name, load_balancer)
+            if (server := self.client_server[client]) != NO_ID:
+                graph.add_edge(load_balancer, self.servers[server].name, client=name)
+        return graph
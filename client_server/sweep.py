@@ -0,0 +1,209 @@
+"""Parameter sweeps over `DemoSettings`, one headless run per process.
+
+```shell
+python sweep.py --grid server_scale_up_threshold=0.7,0.8,0.9 emwa_alpha=0.2,0.5
+python sweep.py --sample 200 --space server_scale_up_threshold=0.6:0.95 \
+    max_connections=5:20 SINUSOIDAL=true,false --output sweep.parquet
+```
+"""
+
+import argparse
+import csv
+import itertools
+import json
+import multiprocessing
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+from settings import DemoSettings
+
+
+def parse_space(specs: list[str]) -> dict[str, list[Any] | tuple[float, float]]:
+    """Parse `name=a,b,c` (choices) and `name=lo:hi` (a range to sample from)."""
+    space = {}
+    for spec in specs:
+        name, _, values = spec.partition("=")
+        if name not in DemoSettings.model_fields:
+            raise SystemExit(f"unknown setting: {name}")
+        if ":" in values:
+            lo, hi = (json.loads(v) for v in values.split(":"))
+            space[name] = (lo, hi)
+        else:
+            space[name] = [_parse_value(v) for v in values.split(",")]
+    return space
+
+
+def _parse_value(value: str) -> Any:
+    try:
+        return json.loads(value)
+    except json.JSONDecodeError:
+        return value
+
+
+def grid(space: dict[str, list[Any] | tuple]) -> list[dict[str, Any]]:
+    if any(isinstance(values, tuple) for values in space.values()):
+        raise SystemExit("ranges (lo:hi) can only be sampled, use --sample")
+    return [dict(zip(space, combo)) for combo in itertools.product(*space.values())]
+
+
+def sample(space: dict[str, list[Any] | tuple], n: int, rng: random.Random):
+    def draw(values):
+        if isinstance(values, list):
+            return rng.choice(values)
+        lo, hi = values
+        if isinstance(lo, int) and isinstance(hi, int):
+            return rng.randint(lo, hi)
+        return rng.uniform(lo, hi)
+
+    return [{name: draw(values) for name, values in space.items()} for _ in range(n)]
+
+
+def apply_overrides(overrides: dict[str, Any]):
+    """Rebind the shared `settings` in place, before the simulation reads it."""
+    from settings import settings
+
+    # the simulation's globals (`STATE`, `SIGNALS`, ...) are sized from settings
+    # when `variables` is imported, so overriding afterwards would be ignored
+    if "variables" in sys.modules:
+        raise RuntimeError("settings must be overridden before the simulation loads")
+    configured = DemoSettings(**overrides)
+    for name in DemoSettings.model_fields:
+        setattr(settings, name, getattr(configured, name))
+    return settings
+
+
+def run_config(
+    index: int, overrides: dict[str, Any], seeds: list[int], steps: int
+) -> list[dict[str, Any]]:
+    """Run one configuration (in a fresh process) once per seed."""
+    settings = apply_overrides(overrides)
+    if settings.event_log_path:
+        # one event log per config, rather than every worker writing the same file
+        path = Path(settings.event_log_path)
+        settings.event_log_path = str(path.with_stem(f"{path.stem}-{index}"))
+    from engine import run_headless
+
+    rows = []
+    for seed in seeds:
+        start = time.perf_counter()
+        metrics = run_headless(steps, seed)
+        elapsed = time.perf_counter() - start
+        rows.append(
+            {"config": index, **overrides, "seed": seed}
+            | summarize(metrics)
+            | {"elapsed": elapsed}
+        )
+    return rows
+
+
+def run_sweep(
+    configs: list[dict[str, Any]],
+    seeds: list[list[int]],
+    steps: int,
+    workers: int | None = None,
+    progress: bool = False,
+) -> list[dict[str, Any]]:
+    """Run every config with its seeds, one spawned interpreter per config."""
+    rows = []
+    # a fresh interpreter per config, since the simulation's globals are built
+    # from settings on import
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        max_tasks_per_child=1,
+    ) as pool:
+        futures = [
+            pool.submit(run_config, i, config, config_seeds, steps)
+            for i, (config, config_seeds) in enumerate(zip(configs, seeds))
+        ]
+        for i, future in enumerate(as_completed(futures), 1):
+            rows.extend(future.result())
+            if progress:
+                print(f"{i}/{len(futures)} configs done", end="\r")
+    return sorted(rows, key=lambda row: row["config"])
+
+
+def summarize(metrics: list) -> dict[str, float]:
+    def column(name):
+        return np.array([getattr(m, name) for m in metrics], dtype=float)
+
+    queue, servers = column("queue_depth"), column("servers")
+    pressure, imbalance = column("pressure"), column("imbalance")
+    p50, p99 = column("latency_p50"), column("latency_p99")
+    latency = (
+        {
+            "latency_p50_mean": np.nanmean(p50),
+            "latency_p99_mean": np.nanmean(p99),
+            "latency_p99_max": np.nanmax(p99),
+        }
+        if not np.isnan(p99).all()
+        else {}
+    )
+    return {
+        "steps": len(metrics),
+        "arrivals": int(column("arrivals").sum()),
+        "connected": int(column("connected").sum()),
+        "refusals": int(column("refused").sum()),
+        "dropped": int(column("dropped").sum()),
+        "queue_depth_mean": queue.mean(),
+        "queue_depth_max": queue.max(),
+        "server_steps": int(servers.sum()),
+        "servers_mean": servers.mean(),
+        "servers_max": servers.max(),
+        "pressure_mean": pressure.mean(),
+        "pressure_p95": np.percentile(pressure, 95),
+        "pressure_max": pressure.max(),
+        "ewma_mean": column("ewma").mean(),
+        "imbalance_mean": imbalance.mean(),
+    } | latency
+
+
+def write_table(rows: list[dict[str, Any]], path: str):
+    columns = list(dict.fromkeys(key for row in rows for key in row))
+    if path.endswith(".parquet"):
+        # imported late: `recording` loads the simulation, see `apply_overrides`
+        from recording import import_parquet
+
+        pa, pq = import_parquet()
+        table = pa.table({name: [row.get(name) for row in rows] for name in columns})
+        pq.write_table(table, path)
+        return
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=columns)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    mode = parser.add_mutually_exclusive_group(required=True)
+    mode.add_argument("--grid", nargs="+", metavar="NAME=A,B,...")
+    mode.add_argument("--sample", type=int, metavar="N", help="random configurations")
+    parser.add_argument("--space", nargs="+", default=[], metavar="NAME=LO:HI|A,B")
+    parser.add_argument("--steps", type=int, default=10_000)
+    parser.add_argument("--replicates", type=int, default=1, help="seeds per config")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--output", default="sweep.csv")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    if args.grid:
+        configs = grid(parse_space(args.grid))
+    else:
+        configs = sample(parse_space(args.space), args.sample, rng)
+    seeds = np.random.SeedSequence(args.seed).generate_state(
+        len(configs) * args.replicates
+    )
+    seeds = seeds.reshape(len(configs), args.replicates).tolist()
+
+    start = time.perf_counter()
+    rows = run_sweep(configs, seeds, args.steps, args.workers, progress=True)
+    write_table(rows, args.output)
+    print(f"\n{len(rows)} runs in {time.perf_counter() - start:.1f}s -> {args.output}")
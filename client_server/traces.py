@@ -0,0 +1,236 @@
+"""Replay recorded arrivals (and, optionally, connection lifetimes) through the simulation.
+
+A trace is a table with one row per connection: its arrival `time` (seconds, or
+ISO timestamps in CSV) and, optionally, its `lifetime` in seconds. It is read in
+chunks of `chunk_rows`, so memory stays bounded however long the trace is. A
+bare `.npy` array is read as arrival times alone.
+`--time-scale` is the number of trace seconds per simulation step: 60 replays a
+day of traffic in 1440 steps.
+
+```shell
+python traces.py connections.csv --time-scale 60
+python traces.py connections.parquet --time-scale 1 --steps 10000 --record run/
+python traces.py connections.npz --time-scale 0.5  # `time` and `lifetime` arrays
+```
+"""
+
+import argparse
+import csv
+import itertools
+import random
+import time
+import zipfile
+from collections.abc import Iterable, Iterator
+from dataclasses import asdict
+from datetime import datetime
+
+import numpy as np
+from engine import StepMetrics, step
+from recording import MetricsRecorder, import_parquet
+from variables import reset_state
+
+Chunk = tuple[np.ndarray, np.ndarray | None]  # arrival times, lifetimes
+
+
+def _seconds(values: np.ndarray) -> np.ndarray:
+    if np.issubdtype(values.dtype, np.datetime64):
+        return values.astype("datetime64[ns]").astype(np.int64) / 1e9
+    return values.astype(np.float64)
+
+
+def _parse_time(value: str) -> float:
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.fromisoformat(value).timestamp()
+
+
+def _read_csv(
+    path: str, chunk_rows: int, time_column: str, lifetime_column: str
+) -> Iterator[Chunk]:
+    with open(path, newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        time_index = header.index(time_column)
+        lifetime_index = (
+            header.index(lifetime_column) if lifetime_column in header else None
+        )
+        while rows := list(itertools.islice(reader, chunk_rows)):
+            times = np.array([_parse_time(row[time_index]) for row in rows])
+            lifetimes = (
+                np.array([float(row[lifetime_index]) for row in rows])
+                if lifetime_index is not None
+                else None
+            )
+            yield times, lifetimes
+
+
+def _read_parquet(
+    path: str, chunk_rows: int, time_column: str, lifetime_column: str
+) -> Iterator[Chunk]:
+    _, pq = import_parquet()
+    file = pq.ParquetFile(path)
+    has_lifetime = lifetime_column in file.schema_arrow.names
+    columns = [time_column, lifetime_column] if has_lifetime else [time_column]
+    for batch in file.iter_batches(batch_size=chunk_rows, columns=columns):
+        times = _seconds(batch.column(0).to_numpy())
+        lifetimes = batch.column(1).to_numpy().astype(float) if has_lifetime else None
+        yield times, lifetimes
+
+
+def _npy_chunks(member, chunk_rows: int) -> Iterator[np.ndarray]:
+    """Read an `.npy` stream `chunk_rows` elements at a time, never all of it."""
+    version = np.lib.format.read_magic(member)
+    if version == (1, 0):
+        shape, _, dtype = np.lib.format.read_array_header_1_0(member)
+    else:
+        shape, _, dtype = np.lib.format.read_array_header_2_0(member)
+    if len(shape) != 1 or dtype.hasobject:
+        raise ValueError(f"expected a 1-d numeric array, got {dtype} {shape}")
+    while data := member.read(chunk_rows * dtype.itemsize):
+        yield np.frombuffer(data, dtype=dtype)
+
+
+def _read_npz(
+    path: str, chunk_rows: int, time_column: str, lifetime_column: str
+) -> Iterator[Chunk]:
+    # `np.load` would decompress a whole member at once: stream it from the zip
+    with zipfile.ZipFile(path) as archive:
+        names = archive.namelist()
+        with archive.open(f"{time_column}.npy") as member:
+            times = _npy_chunks(member, chunk_rows)
+            if f"{lifetime_column}.npy" not in names:
+                for chunk in times:
+                    yield _seconds(chunk), None
+                return
+            with archive.open(f"{lifetime_column}.npy") as lifetime_member:
+                lifetimes = _npy_chunks(lifetime_member, chunk_rows)
+                for time_chunk, lifetime_chunk in zip(times, lifetimes, strict=True):
+                    yield _seconds(time_chunk), lifetime_chunk.astype(float)
+
+
+def _read_npy(
+    path: str, chunk_rows: int, time_column: str, lifetime_column: str
+) -> Iterator[Chunk]:
+    times = np.load(path, mmap_mode="r")
+    for i in range(0, len(times), chunk_rows):
+        yield _seconds(np.asarray(times[i : i + chunk_rows])), None
+
+
+def read_trace(
+    path: str,
+    chunk_rows: int = 65536,
+    time_column: str = "time",
+    lifetime_column: str = "lifetime",
+) -> Iterator[Chunk]:
+    """Arrival times (in seconds) and lifetimes (`None` if absent) in chunks."""
+    if path.endswith(".parquet"):
+        reader = _read_parquet
+    elif path.endswith(".npz"):
+        reader = _read_npz
+    elif path.endswith(".npy"):
+        reader = _read_npy
+    else:
+        reader = _read_csv
+    return reader(path, chunk_rows, time_column, lifetime_column)
+
+
+def trace_steps(
+    chunks: Iterable[Chunk], time_scale: float, start: float | None = None
+) -> Iterator[list[int | None]]:
+    """Group arrivals into simulation steps of `time_scale` seconds each.
+
+    Yields, per step, the lifetime in steps of every arrival (`None` for ones to
+    draw from the settings), including an empty list for steps nobody arrives
+    in. Steps are counted from `start`, or from the first arrival; earlier
+    arrivals are skipped.
+    """
+    if time_scale <= 0:
+        raise ValueError("time_scale must be positive")
+    current, batch, last = 0, [], -np.inf
+    for times, lifetimes in chunks:
+        if not len(times):
+            continue
+        if times[0] < last or np.any(np.diff(times) < 0):
+            raise ValueError("trace arrival times must be sorted")
+        last = times[-1]
+        if start is None:
+            start = float(times[0])
+        keep = times >= start
+        if not keep.any():
+            continue
+        steps = ((times[keep] - start) // time_scale).astype(np.int64)
+        if lifetimes is None:
+            lifetimes = [None] * len(steps)
+        else:
+            lifetimes = np.maximum(1, np.rint(lifetimes[keep] / time_scale))
+            lifetimes = lifetimes.astype(np.int64).tolist()
+        bounds = (np.flatnonzero(np.diff(steps)) + 1).tolist()
+        for lo, hi in zip([0, *bounds], [*bounds, len(steps)]):
+            if (at := int(steps[lo])) != current:
+                yield batch
+                yield from ([] for _ in range(current + 1, at))
+                current, batch = at, []
+            batch.extend(lifetimes[lo:hi])
+    if start is not None:
+        yield batch
+
+
+def run_trace(
+    path: str,
+    time_scale: float,
+    num_steps: int | None = None,
+    seed: int | None = None,
+    recorder: MetricsRecorder | None = None,
+) -> list[StepMetrics]:
+    """Run the headless simulation from a fresh network with arrivals from `path`.
+
+    Stops when the trace runs out, or after `num_steps` steps.
+    """
+    if seed is not None:
+        random.seed(seed)
+    reset_state()
+    metrics = []
+    steps = itertools.islice(trace_steps(read_trace(path), time_scale), num_steps)
+    for i, lifetimes in enumerate(steps):
+        metrics.append(step(i, lifetimes))
+        if recorder is not None:
+            recorder.record(metrics[-1])
+    if recorder is not None:
+        recorder.close()
+    return metrics
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("trace", help="a .csv, .parquet or .npz arrival trace")
+    parser.add_argument(
+        "--time-scale",
+        type=float,
+        default=1.0,
+        help="trace seconds per simulation step",
+    )
+    parser.add_argument("--steps", type=int, help="stop after this many steps")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument(
+        "--record",
+        metavar="PATH",
+        help="write per-step metrics to a .parquet file or a directory of .npz chunks",
+    )
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    recorder = MetricsRecorder(args.record) if args.record else None
+    metrics = run_trace(args.trace, args.time_scale, args.steps, args.seed, recorder)
+    elapsed = time.perf_counter() - start
+
+    print(
+        f"{len(metrics)} steps in {elapsed:.2f}s ({len(metrics) / elapsed:,.0f} steps/s)"
+    )
+    if metrics:
+        print(asdict(metrics[-1]))
+        print(
+            f"arrivals: {sum(m.arrivals for m in metrics):,}  "
+            f"refusals: {sum(m.refused for m in metrics):,}  "
+            f"server-steps: {sum(m.servers for m in metrics):,}"
+        )
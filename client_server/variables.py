@@ -1,28 +1,69 @@
+import atexit
+import random
 from collections import deque
-from threading import Event, Lock
+from threading import Event
 
-import networkx as nx
+from autoscaling import make_policy
+from balancing import make_strategy
+from eventlog import EventLog
+from expiry import ExpiryScheduler
+from profiling import PhaseTimer, StepProfiler
 from rich.console import Console
+from service import ServiceModel
 from settings import settings
+from signals import PressureSignals
+from state import ConnectionState, VersionedDeque
 
 CONSOLE = Console()
-LOG_BUFFER = deque(maxlen=settings.LOG_TAIL)
 
-CLIENT_LIFETIMES = {}
-CLIENT_QUEUE = deque()
+CLIENT_LIFETIMES = ExpiryScheduler()  # client ID -> remaining steps
+LOG_BUFFER = EventLog(settings.LOG_TAIL, sink_path=settings.event_log_path)
+atexit.register(LOG_BUFFER.close)
+CLIENT_QUEUE: deque[int] = VersionedDeque()
 CLIENT_POOL = deque([f"Client_{i:02d}" for i in range(settings.client_pool_size)])
-SERVERS = {
-    f"Server_{chr(65 + i)}": deque(maxlen=settings.max_connections)
-    for i in range(settings.num_servers)
-}
 SERVER_PRESSURE_HISTORY = deque(maxlen=settings.max_pressure_history)
+SIGNALS = PressureSignals(
+    SERVER_PRESSURE_HISTORY,
+    alphas=sorted({settings.emwa_alpha, *settings.signal_alphas}),
+    bins=settings.pressure_sketch_bins,
+)
 LOAD_BALANCERS = deque(
     [f"LoadBalancer_{i+1}" for i in range(settings.num_load_balancers)]
 )
 
-NETWORK = nx.MultiGraph()
-NETWORK.add_nodes_from(LOAD_BALANCERS, type="load_balancer")
-NETWORK.add_nodes_from(SERVERS, type="server")
+STATE = ConnectionState(
+    list(CLIENT_POOL), list(LOAD_BALANCERS), settings.max_connections
+)
+STATE.reset(settings.num_servers)
+SERVERS = STATE.servers
+make_strategy(settings.balancing_strategy, STATE)
+AUTOSCALER = make_policy(settings.autoscale_policy, STATE, SIGNALS)
+
+SERVICE = ServiceModel(
+    settings.service_discipline, settings.service_rate, settings.request_rate
+)
 
-LOCK = Lock()
 UPDATE_EVENT = Event()
+TIMER = PhaseTimer(
+    settings.profile_phases,
+    settings.profile_window,
+    (
+        StepProfiler(
+            *settings.profile_steps, settings.profile_output, settings.profiler
+        )
+        if settings.profile_steps
+        else None
+    ),
+)
+
+
+def reset_state():
+    """Restore the initial network in place (other modules hold references)."""
+    STATE.reset(settings.num_servers)
+    CLIENT_LIFETIMES.clear()
+    CLIENT_QUEUE.clear()
+    SIGNALS.reset()
+    AUTOSCALER.reset()
+    LOG_BUFFER.clear()
+    if settings.service_model:
+        SERVICE.reset(random.getrandbits(64))
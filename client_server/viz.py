@@ -1,24 +1,27 @@
-from datetime import UTC, datetime
+import math
+import time
+from collections.abc import Callable, Hashable
+from operator import attrgetter
 
 import networkx as nx
 import numpy as np
+from eventlog import format_event
 from matplotlib import pyplot as plt
+from matplotlib.collections import LineCollection
+from matplotlib.text import Text as TextArtist
 from rich.layout import Layout
 from rich.live import Live
 from rich.panel import Panel
 from rich.text import Text
-from servers import calculate_ewma, calculate_server_pressure
 from settings import settings
+from snapshot import SNAPSHOTS, Snapshot
+from state import NO_ID
 from variables import (
-    CLIENT_LIFETIMES,
     CLIENT_POOL,
-    CLIENT_QUEUE,
     CONSOLE,
     LOAD_BALANCERS,
-    LOCK,
-    LOG_BUFFER,
-    NETWORK,
     SERVERS,
+    STATE,
     UPDATE_EVENT,
 )
 
@@ -31,18 +34,11 @@ def get_colors(status: dict[str, int], cmap_name: str = "viridis") -> dict[str,
 
 
 def get_server_status() -> dict[str, int]:
-    with LOCK:
-        return {server: len(SERVERS[server]) for server in SERVERS}
+    return {server.name: len(server) for server in SERVERS.values()}
 
 
 def get_load_balancer_status() -> dict[str, int]:
-    with LOCK:
-        status = {load_balancer: 0 for load_balancer in LOAD_BALANCERS}
-        for load_balancer in LOAD_BALANCERS:
-            for neighbor in NETWORK.neighbors(load_balancer):
-                if NETWORK.nodes[neighbor]["type"] == "client":
-                    status[load_balancer] += 1
-    return status
+    return dict(zip(LOAD_BALANCERS, STATE.lb_load.tolist()))
 
 
 def create_layout() -> Layout:
@@ -63,61 +59,81 @@ def create_layout() -> Layout:
         Layout(name="load_balancer_panel", ratio=1),
     )
     layout["middle_panel"].split_column(
-        Layout(name="logs", ratio=1),
+        Layout(name="logs", ratio=3),
+        Layout(name="profile", ratio=1),
     )
     return layout
 
 
-def update_header() -> Panel:
-    with LOCK:
-        n_active_servers = len(
-            [server for server in SERVERS if NETWORK.degree(server) > 0]
-        )
-
-        return Panel(
-            Text(
-                (
-                    f"Active Clients: {len(CLIENT_LIFETIMES)} | "
-                    f"Total known users: {len(CLIENT_POOL)} | "
-                    f"Active Servers: {n_active_servers} | "
-                    f"Total Servers: {len(SERVERS)} | "
-                    f"Last Updated: {datetime.now(UTC).strftime('%B %d, %Y %I:%M:%S %p %Z')}"
-                ),
-                style="bold cyan",
-                justify="center",
-                end="",
+def update_header(snapshot: Snapshot) -> Panel:
+    n_active_servers = sum(
+        1 for _, connections in snapshot.server_status if connections
+    )
+    return Panel(
+        Text(
+            (
+                f"Active Clients: {snapshot.active_clients} | "
+                f"Total known users: {len(CLIENT_POOL)} | "
+                f"Active Servers: {n_active_servers} | "
+                f"Total Servers: {len(snapshot.server_status)} | "
+                f"Last Updated: {snapshot.taken_at.strftime('%B %d, %Y %I:%M:%S %p %Z')}"
             ),
-            title="Network Status",
-            border_style="blue",
-        )
+            style="bold cyan",
+            justify="center",
+            end="",
+        ),
+        title="Network Status",
+        border_style="blue",
+    )
 
 
-def update_metrics_panel() -> Panel:
-    with LOCK:
-        return Panel(
-            Text(
-                (
-                    f"Server Pressure: {100*calculate_server_pressure():.2f}% | "
-                    f"EWMA Server Pressure: {100*calculate_ewma(settings.emwa_alpha):.2f}% | "
-                    f"Client Queue Depth: {len(CLIENT_QUEUE)}"
-                ),
-                style="bold cyan",
-                justify="center",
-                end="",
+def update_metrics_panel(snapshot: Snapshot) -> Panel:
+    return Panel(
+        Text(
+            (
+                f"Server Pressure: {100 * snapshot.pressure:.2f}% | "
+                f"EWMA Server Pressure: {100 * snapshot.ewma:.2f}% | "
+                f"p{settings.scaling_percentile:g} Pressure: {100 * snapshot.percentile:.0f}% | "
+                f"Pressure Trend: {100 * snapshot.trend:+.2f}%/step | "
+                f"Client Queue Depth: {snapshot.queue_depth}"
+                + (
+                    " | Response p50/p95/p99: "
+                    + "/".join(f"{latency:.3f}" for latency in snapshot.latency)
+                    + " steps"
+                    if snapshot.latency
+                    else ""
+                )
             ),
-            title="Metrics",
-            border_style="blue",
-        )
+            style="bold cyan",
+            justify="center",
+            end="",
+        ),
+        title="Metrics",
+        border_style="blue",
+    )
+
+
+def _more(total: int) -> list[str]:
+    hidden = total - settings.dashboard_max_rows
+    return [f"... and {hidden} more"] if hidden > 0 else []
 
 
-def update_server_panel() -> Panel:
+def update_server_panel(snapshot: Snapshot) -> Panel:
     return Panel(
         Text(
             "\n".join(
                 [
                     f"{server} is {'active' if connections else 'idle'} with {connections} connected client(s)"
-                    for server, connections in sorted(get_server_status().items())
+                    + (f", p99 {p99:.3f} steps" if not math.isnan(p99) else "")
+                    for (server, connections), p99 in sorted(
+                        zip(
+                            snapshot.server_status,
+                            snapshot.server_p99
+                            or [math.nan] * len(snapshot.server_status),
+                        )
+                    )[: settings.dashboard_max_rows]
                 ]
+                + _more(len(snapshot.server_status))
             ),
             style="cyan",
         ),
@@ -126,12 +142,13 @@ def update_server_panel() -> Panel:
     )
 
 
-def update_client_panel() -> Panel:
+def update_client_panel(snapshot: Snapshot) -> Panel:
     client_text = "\n".join(
         [
-            f"{client}: {lifetime}"
-            for client, lifetime in sorted(CLIENT_LIFETIMES.items())
+            f"{STATE.client_names[client]}: {lifetime}"
+            for client, lifetime in snapshot.longest_lived
         ]
+        + _more(snapshot.active_clients)
     )
     return Panel(
         Text(client_text, style="green"),
@@ -141,22 +158,29 @@ def update_client_panel() -> Panel:
     )
 
 
-def update_log_panel() -> Panel:
+def update_log_panel(snapshot: Snapshot) -> Panel:
+    load_balancers = list(LOAD_BALANCERS)
     return Panel(
-        Text("\n".join(LOG_BUFFER), justify="left"),
+        Text(
+            "\n".join(
+                format_event(event, STATE.client_names, load_balancers)
+                for event in snapshot.events
+            ),
+            justify="left",
+        ),
         title="Logs",
         border_style="red",
     )
 
 
-def update_load_balancer_panel() -> Panel:
+def update_load_balancer_panel(snapshot: Snapshot) -> Panel:
     return Panel(
         Text(
             "\n".join(
                 [
                     f"{load_balancer} has {connections} connected client(s)"
                     for load_balancer, connections in sorted(
-                        get_load_balancer_status().items()
+                        snapshot.load_balancer_status
                     )
                 ]
             ),
@@ -167,7 +191,23 @@ def update_load_balancer_panel() -> Panel:
     )
 
 
-def update_settings_panel() -> Panel:
+def update_profile_panel(snapshot: Snapshot) -> Panel:
+    if not snapshot.phase_times:
+        text = "Phase timing is off (set DEMO_PROFILE_PHASES=true)"
+    else:
+        text = "\n".join(
+            f"{name:<10} {1e3 * mean:8.2f} ms  p95 {1e3 * p95:8.2f} ms  "
+            f"{'█' * round(20 * share):<20} {share:6.1%}"
+            for name, mean, p95, share in snapshot.phase_times
+        )
+    return Panel(
+        Text(text, style="yellow"),
+        title="Step Time by Phase",
+        border_style="yellow",
+    )
+
+
+def update_settings_panel(snapshot: Snapshot) -> Panel:
     return Panel(
         Text(repr(settings), style="magenta", justify="left"),
         title="Active Settings",
@@ -175,8 +215,55 @@ def update_settings_panel() -> Panel:
     )
 
 
+class PanelScheduler:
+    """Rebuilds a layout panel only when the data behind it has changed."""
+
+    def __init__(self, layout: Layout):
+        self.layout = layout
+        self.panels: dict[
+            str,
+            tuple[Callable[[Snapshot], Hashable], Callable[[Snapshot], Panel]],
+        ] = {}
+        self.seen: dict[str, Hashable] = {}
+
+    def register(
+        self,
+        name: str,
+        version: Callable[[Snapshot], Hashable],
+        build: Callable[[Snapshot], Panel],
+    ):
+        self.panels[name] = (version, build)
+
+    def render(self, snapshot: Snapshot):
+        for name, (version, build) in self.panels.items():
+            if (current := version(snapshot)) != self.seen.get(name, object()):
+                self.layout[name].update(build(snapshot))
+                self.seen[name] = current
+
+
 def live_rich_console():
+    """Draw the dashboard from `SNAPSHOTS`; runs in its own thread, without locks."""
     layout = create_layout()
+    scheduler = PanelScheduler(layout)
+    scheduler.register(
+        "header", attrgetter("state_version", "lifetimes_version"), update_header
+    )
+    scheduler.register(
+        "metrics", attrgetter("signals_version", "queue_version"), update_metrics_panel
+    )
+    scheduler.register(
+        "client_panel", attrgetter("lifetimes_version"), update_client_panel
+    )
+    scheduler.register("server_panel", attrgetter("state_version"), update_server_panel)
+    scheduler.register(
+        "load_balancer_panel",
+        attrgetter("state_version"),
+        update_load_balancer_panel,
+    )
+    scheduler.register("logs", attrgetter("log_version"), update_log_panel)
+    scheduler.register("profile", attrgetter("phase_times"), update_profile_panel)
+    scheduler.register("settings_panel", lambda _: None, update_settings_panel)
+    frame_time = 1 / settings.dashboard_fps
 
     with Live(
         layout,
@@ -188,37 +275,64 @@ def live_rich_console():
             try:
                 UPDATE_EVENT.wait()
                 UPDATE_EVENT.clear()
-                layout["header"].update(update_header())
-                layout["metrics"].update(update_metrics_panel())
-                layout["client_panel"].update(update_client_panel())
-                layout["server_panel"].update(update_server_panel())
-                layout["load_balancer_panel"].update(update_load_balancer_panel())
-                layout["logs"].update(update_log_panel())
-                layout["settings_panel"].update(update_settings_panel())
+                start = time.monotonic()
+                if (snapshot := SNAPSHOTS.front) is not None:
+                    scheduler.render(snapshot)
+                # snapshots published while we sleep are coalesced into the next frame
+                time.sleep(max(0.0, frame_time - (time.monotonic() - start)))
             except Exception as e:
                 print(e, file=open("error_log.txt", "a"))
 
 
+POSITIONS: dict[str, np.ndarray] = {}  # node positions cached across frames
+
+
 def circular_layout(
     network: nx.Graph, radius: float = 1
 ) -> dict[str, tuple[float, float]]:
-    pos = {}
+    """Servers on a circle; everything else keeps its position from the last frame.
+
+    Only nodes new since the last frame are laid out: seeded next to their load
+    balancer and relaxed for `settings.layout_iterations` spring iterations
+    against their (fixed) neighbors, rather than re-running the full layout.
+    """
     servers = [n for n in network.nodes if network.nodes[n]["type"] == "server"]
     num_servers = len(servers)
     angle_step = 2 * np.pi / (num_servers or 1)  # avoid division by zero
 
+    for node in POSITIONS.keys() - network.nodes:
+        del POSITIONS[node]
     for i, server in enumerate(servers):
         angle = i * angle_step
-        pos[server] = (radius * np.cos(angle), radius * np.sin(angle))
-
-    pos.update(nx.spring_layout(network, pos=pos, fixed=pos.keys()))
+        POSITIONS[server] = np.array([radius * np.cos(angle), radius * np.sin(angle)])
+
+    if new_nodes := [node for node in network.nodes if node not in POSITIONS]:
+        for node in new_nodes:
+            anchors = [n for n in network.neighbors(node) if n in POSITIONS]
+            center = POSITIONS[anchors[0]] if anchors else np.zeros(2)
+            angle = np.random.uniform(0, 2 * np.pi)
+            offset = np.random.uniform(0.1, 0.3) * radius
+            POSITIONS[node] = center + offset * np.array([np.cos(angle), np.sin(angle)])
+        neighborhood = network.subgraph(
+            set(new_nodes).union(*(network.neighbors(node) for node in new_nodes))
+        )
+        POSITIONS.update(
+            nx.spring_layout(
+                neighborhood,
+                pos={node: POSITIONS[node] for node in neighborhood},
+                fixed=neighborhood.nodes - new_nodes,
+                k=0.2 * radius,
+                iterations=settings.layout_iterations,
+            )
+        )
 
-    return pos
+    return POSITIONS
 
 
 def visualize_network(step: int, ax):
     ax.clear()
-    pos = circular_layout(NETWORK)
+    network = STATE.network()
+    pos = circular_layout(network)
 
     server_status = get_server_status()
     load_balancer_status = get_load_balancer_status()
@@ -226,11 +340,11 @@ def visualize_network(step: int, ax):
     load_balancer_colors = get_colors(load_balancer_status, "viridis")
 
     nx.draw_networkx_nodes(
-        NETWORK,
+        network,
         pos,
         nodelist=[
             node
-            for node, data in NETWORK.nodes(data=True)
+            for node, data in network.nodes(data=True)
             if data["type"] == "load_balancer"
         ],
         node_color=[load_balancer_colors[node] for node in LOAD_BALANCERS],
@@ -240,13 +354,14 @@ def visualize_network(step: int, ax):
     )
 
     nx.draw_networkx_nodes(
-        NETWORK,
+        network,
         pos,
         nodelist=[
-            node for node, data in NETWORK.nodes(data=True) if data["type"] == "server"
+            node for node, data in network.nodes(data=True) if data["type"] == "server"
         ],
         node_color=[
-            "orange" if server_status[server] else "gray" for server in SERVERS
+            "orange" if server_status[server.name] else "gray"
+            for server in SERVERS.values()
         ],
         node_size=settings.server_node_size,
         label="Servers",
@@ -254,10 +369,10 @@ def visualize_network(step: int, ax):
     )
 
     nx.draw_networkx_nodes(
-        NETWORK,
+        network,
         pos,
         nodelist=[
-            node for node, data in NETWORK.nodes(data=True) if data["type"] == "client"
+            node for node, data in network.nodes(data=True) if data["type"] == "client"
         ],
         node_color="green",
         node_size=settings.client_node_size,
@@ -266,33 +381,189 @@ def visualize_network(step: int, ax):
     )
 
     nx.draw_networkx_edges(
-        NETWORK,
+        network,
         pos,
         edgelist=[
             (u, v)
-            for u, v in NETWORK.edges()
-            if NETWORK.nodes[u]["type"] == "load_balancer"
-            and NETWORK.nodes[v]["type"] == "client"
+            for u, v in network.edges()
+            if network.nodes[u]["type"] == "load_balancer"
+            and network.nodes[v]["type"] == "client"
         ],
         edge_color="green",
         ax=ax,
     )
 
     nx.draw_networkx_edges(
-        NETWORK,
+        network,
         pos,
         edgelist=[
             (u, v)
-            for u, v in NETWORK.edges()
-            if NETWORK.nodes[u]["type"] == "load_balancer"
-            and NETWORK.nodes[v]["type"] == "server"
+            for u, v in network.edges()
+            if network.nodes[u]["type"] == "load_balancer"
+            and network.nodes[v]["type"] == "server"
         ],
         edge_color="orange",
         ax=ax,
     )
 
-    nx.draw_networkx_labels(NETWORK, pos, ax=ax)
+    nx.draw_networkx_labels(network, pos, ax=ax)
     ax.legend()
     ax.set_title(
         f"Server-Client Network Simulation with Load Balancers - Step {step + 1}"
     )
+
+
+class NetworkRenderer:
+    """Persistent-artist alternative to `visualize_network` for `blit=True`.
+
+    Node and edge collections are created once and updated in place each frame
+    (offsets, colors, segments), computed from `STATE`'s arrays rather than a
+    graph; label artists are only added or removed when the node set changes.
+
+    Servers sit on a circle and load balancers on an inner one. A client is
+    drawn at a random offset from the node it hangs off (its server, or its
+    load balancer until it has one), picked when it attaches, so it follows
+    that node around without re-running a layout.
+    """
+
+    def __init__(self, ax, radius: float = 1):
+        self.ax = ax
+        self.radius = radius
+        self.load_balancers = ax.scatter(
+            [],
+            [],
+            s=settings.load_balancer_node_size,
+            c=settings.load_balancer_color,
+            zorder=3,
+            label="Load Balancers",
+        )
+        self.servers = ax.scatter(
+            [], [], s=settings.server_node_size, c="orange", zorder=3, label="Servers"
+        )
+        self.clients = ax.scatter(
+            [], [], s=settings.client_node_size, c="green", zorder=2, label="Clients"
+        )
+        self.client_edges = ax.add_collection(
+            LineCollection([], colors="green", zorder=1)
+        )
+        self.server_edges = ax.add_collection(
+            LineCollection([], colors="orange", zorder=1)
+        )
+        # the title sits outside the axes, which blitting doesn't redraw
+        self.title = ax.text(
+            0.5, 0.98, "", transform=ax.transAxes, ha="center", va="top"
+        )
+        self.labels: dict[str, TextArtist] = {}
+        self.labels_key: bytes | None = None
+
+        self.rng = np.random.default_rng()
+        self.cmap = plt.get_cmap("viridis")
+        angles = (
+            (np.arange(len(LOAD_BALANCERS)) + 0.5) * 2 * np.pi / len(LOAD_BALANCERS)
+        )
+        self.load_balancer_xy = 0.4 * radius * _unit(angles)
+        # per client ID: the node it was placed at (server ID, or `-2 - load
+        # balancer`; `NO_ID` while offline) and its offset from that node
+        self.client_anchor = np.full(len(STATE.client_names), NO_ID)
+        self.client_offset = np.zeros((len(STATE.client_names), 2))
+
+        limit = 1.5 * radius
+        ax.set_xlim(-limit, limit)
+        ax.set_ylim(-limit, limit)
+        ax.set_xticks([])
+        ax.set_yticks([])
+        ax.legend(loc="upper left")
+
+    @property
+    def artists(self) -> list:
+        return [
+            self.client_edges,
+            self.server_edges,
+            self.clients,
+            self.load_balancers,
+            self.servers,
+            self.title,
+            *self.labels.values(),
+        ]
+
+    def update(self, step: int) -> list:
+        server_ids = np.fromiter(STATE.servers, dtype=np.int64, count=len(SERVERS))
+        server_xy = self.radius * _unit(
+            np.arange(len(server_ids)) * 2 * np.pi / (len(server_ids) or 1)
+        )
+        by_id = np.argsort(server_ids)
+
+        clients = np.flatnonzero(STATE.client_lb != NO_ID)
+        load_balancers = STATE.client_lb[clients]
+        servers = STATE.client_server[clients]
+        assigned = servers != NO_ID
+        # position of each assigned client's server in `server_ids`
+        server_index = by_id[
+            np.searchsorted(server_ids, servers[assigned], sorter=by_id)
+        ]
+
+        anchor_xy = self.load_balancer_xy[load_balancers]
+        anchor_xy[assigned] = server_xy[server_index]
+        anchor = np.where(assigned, servers, -2 - load_balancers)
+        moved = clients[self.client_anchor[clients] != anchor]
+        angles = self.rng.uniform(0, 2 * np.pi, len(moved))
+        distances = self.rng.uniform(0.1, 0.3, len(moved)) * self.radius
+        self.client_offset[moved] = distances[:, None] * _unit(angles)
+        self.client_anchor.fill(NO_ID)
+        self.client_anchor[clients] = anchor
+        client_xy = anchor_xy + self.client_offset[clients]
+
+        lb_load = STATE.lb_load
+        self.load_balancers.set_offsets(self.load_balancer_xy)
+        self.load_balancers.set_facecolor(self.cmap(lb_load / (lb_load.max() or 1)))
+        self.servers.set_offsets(server_xy)
+        self.servers.set_facecolor(
+            np.where(STATE.server_load[server_ids] > 0, "orange", "gray")
+        )
+        self.clients.set_offsets(client_xy)
+
+        self.client_edges.set_segments(
+            np.stack([client_xy, self.load_balancer_xy[load_balancers]], axis=1)
+        )
+        # one edge per (load balancer, server) pair with a client between them
+        pairs = np.unique(
+            np.column_stack([load_balancers[assigned], server_index]), axis=0
+        )
+        self.server_edges.set_segments(
+            np.stack(
+                [self.load_balancer_xy[pairs[:, 0]], server_xy[pairs[:, 1]]], axis=1
+            )
+        )
+
+        # without client labels, labels only move when the server set changes
+        labels_key = None if settings.show_client_labels else server_ids.tobytes()
+        if labels_key is None or labels_key != self.labels_key:
+            self.labels_key = labels_key
+            labeled = dict(zip(LOAD_BALANCERS, self.load_balancer_xy))
+            labeled.update(
+                (SERVERS[server].name, xy) for server, xy in zip(server_ids, server_xy)
+            )
+            if settings.show_client_labels:
+                labeled.update(
+                    (STATE.client_names[client], xy)
+                    for client, xy in zip(clients, client_xy)
+                )
+            for node in self.labels.keys() - labeled.keys():
+                self.labels.pop(node).remove()
+            for node, xy in labeled.items():
+                if node in self.labels:
+                    self.labels[node].set_position(xy)
+                else:
+                    self.labels[node] = self.ax.text(
+                        *xy, node, ha="center", va="center", fontsize=10, zorder=4
+                    )
+
+        self.title.set_text(
+            f"Server-Client Network Simulation with Load Balancers - Step {step + 1}"
+        )
+        return self.artists
+
+
+def _unit(angles: np.ndarray) -> np.ndarray:
+    """Points on the unit circle at `angles`, as rows of `(x, y)`."""
+    return np.column_stack([np.cos(angles), np.sin(angles)]).reshape(-1, 2)
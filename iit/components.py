@@ -29,6 +29,7 @@ class State(BaseModel, Generic[T]):
 
 @asynccontextmanager
 async def redis_client() -> AsyncGenerator[redis.Redis, None]:
+    # clients share `config.POOL`: closing one returns its connections, not the pool
     try:
         yield (client := get_redis_client())
     finally:
@@ -1,9 +1,53 @@
 # config.py
+import os
+from collections.abc import AsyncGenerator
+from contextlib import asynccontextmanager
+
 import redis.asyncio as redis
 
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+# connections shared by every client in the process; callers wait (up to
+# `REDIS_POOL_TIMEOUT` seconds) for a free one rather than dialing a new one
+REDIS_MAX_CONNECTIONS = int(os.getenv("REDIS_MAX_CONNECTIONS", "16"))
+REDIS_POOL_TIMEOUT = float(os.getenv("REDIS_POOL_TIMEOUT", "5"))
+# PING connections idle for longer than this many seconds before reusing them
+REDIS_HEALTH_CHECK_INTERVAL = int(os.getenv("REDIS_HEALTH_CHECK_INTERVAL", "30"))
+
+POOL: redis.BlockingConnectionPool | None = None
+
+
+def open_pool() -> redis.BlockingConnectionPool:
+    """Create the process-wide connection pool, if it doesn't exist yet."""
+    global POOL
+    if POOL is None:
+        POOL = redis.BlockingConnectionPool.from_url(
+            REDIS_URL,
+            max_connections=REDIS_MAX_CONNECTIONS,
+            timeout=REDIS_POOL_TIMEOUT,
+            health_check_interval=REDIS_HEALTH_CHECK_INTERVAL,
+        )
+    return POOL
+
+
+async def close_pool():
+    """Disconnect every pooled connection; the next client opens a fresh pool."""
+    global POOL
+    if POOL is not None:
+        pool, POOL = POOL, None
+        await pool.aclose()
+
+
+@asynccontextmanager
+async def redis_pool() -> AsyncGenerator[redis.BlockingConnectionPool, None]:
+    try:
+        yield open_pool()
+    finally:
+        await close_pool()
+
 
 def get_redis_client():
-    return redis.Redis(host="localhost", port=6379, db=0)
+    # borrows connections from the pool per command; closing it leaves the pool open
+    return redis.Redis(connection_pool=open_pool())
 
 
 STREAM_NAME = "mystream"
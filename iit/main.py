@@ -3,6 +3,7 @@ import logging
 
 import anyio
 from components import RedisAggregator, RedisSubsystem, T
+from config import redis_pool
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("🧱")
@@ -27,7 +28,7 @@ async def main():
         merge_fn=lambda values: sum(values) / (len(values) or 0),
     )
 
-    async with anyio.create_task_group() as tg:
+    async with redis_pool(), anyio.create_task_group() as tg:
         # Start subsystems' state update tasks
         tg.start_soon(subsystem_1.update_state)
         tg.start_soon(subsystem_2.update_state)
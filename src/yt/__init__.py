@@ -1 +1,29 @@
-from .settings import settings
+"""Import-cheap entry point: `settings` and submodules load on first access."""
+
+import importlib
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from . import utilities
+    from .settings import settings
+
+__all__ = ["settings", "utilities"]
+
+_SUBMODULES = {"utilities"}
+
+
+def __getattr__(name: str):
+    if name == "settings":
+        from .settings import settings
+
+        # importing the `settings` submodule binds it as a package attribute,
+        # so rebind the name to the settings object itself
+        globals()["settings"] = settings
+        return settings
+    if name in _SUBMODULES:
+        return importlib.import_module(f".{name}", __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
@@ -1,6 +1,11 @@
+import threading
+from typing import Any, Callable, Generic, TypeVar
+
 from pydantic import Field
 from pydantic_settings import BaseSettings
 
+S = TypeVar("S", bound=BaseSettings)
+
 
 class TwilioSettings(BaseSettings):
     model_config = dict(env_prefix="TWILIO_", env_file=".env", extra="ignore")
@@ -16,4 +21,36 @@ class Settings(BaseSettings):
     twilio: TwilioSettings = Field(default_factory=TwilioSettings)
 
 
-settings = Settings()
+class LazySettings(Generic[S]):
+    """Proxy that builds the settings object on first attribute access.
+
+    Avoids reading `.env` (and failing on missing variables) at import time.
+    """
+
+    def __init__(self, factory: Callable[[], S]):
+        self._factory = factory
+        self._instance: S | None = None
+        self._lock = threading.Lock()
+
+    def _load(self) -> S:
+        if self._instance is None:
+            with self._lock:
+                if self._instance is None:
+                    self._instance = self._factory()
+        return self._instance
+
+    def reset(self) -> None:
+        """Drop the built settings so the next access re-reads the environment."""
+        with self._lock:
+            self._instance = None
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._load(), name)
+
+    def __repr__(self) -> str:
+        if self._instance is None:
+            return f"<LazySettings of {self._factory.__name__} (not loaded)>"
+        return repr(self._instance)
+
+
+settings: Settings = LazySettings(Settings)  # type: ignore[assignment]
@@ -1,17 +1,134 @@
 """Module for Pydantic utilities."""
 
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
 from typing import (
+    IO,
     Any,
     Callable,
+    Iterable,
+    Iterator,
     Literal,
+    NamedTuple,
     TypeVar,
+    get_args,
     get_origin,
 )
 
-from pydantic import TypeAdapter
+from pydantic import TypeAdapter, ValidationError
 
 T = TypeVar("T")
 
+DEFAULT_ADAPTER_CACHE_SIZE = 256
+DEFAULT_MAX_READ_SIZE = 1 << 30
+
+
+class AdapterCacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    evictions: int
+    uncacheable: int
+    maxsize: int
+    currsize: int
+
+
+class _AdapterCache:
+    """Thread-safe LRU cache of `TypeAdapter`s keyed by type."""
+
+    def __init__(self, maxsize: int = DEFAULT_ADAPTER_CACHE_SIZE):
+        self._adapters: OrderedDict[Any, TypeAdapter] = OrderedDict()
+        self._lock = threading.Lock()
+        self.maxsize = maxsize
+        self.hits = self.misses = self.evictions = self.uncacheable = 0
+
+    def get(self, type_: Any) -> TypeAdapter:
+        try:
+            hash(type_)
+        except TypeError:
+            # e.g. `Annotated[...]` with unhashable metadata
+            with self._lock:
+                self.uncacheable += 1
+            return TypeAdapter(type_)
+
+        with self._lock:
+            if (adapter := self._adapters.get(type_)) is not None:
+                self._adapters.move_to_end(type_)
+                self.hits += 1
+                return adapter
+            self.misses += 1
+
+        # build outside the lock so a slow schema build doesn't block other threads
+        adapter = TypeAdapter(type_)
+
+        with self._lock:
+            if self.maxsize <= 0:
+                return adapter
+            adapter = self._adapters.setdefault(type_, adapter)
+            self._adapters.move_to_end(type_)
+            self._evict()
+        return adapter
+
+    def resize(self, maxsize: int) -> None:
+        with self._lock:
+            self.maxsize = maxsize
+            self._evict()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._adapters.clear()
+            self.hits = self.misses = self.evictions = self.uncacheable = 0
+
+    def info(self) -> AdapterCacheInfo:
+        with self._lock:
+            return AdapterCacheInfo(
+                self.hits,
+                self.misses,
+                self.evictions,
+                self.uncacheable,
+                self.maxsize,
+                len(self._adapters),
+            )
+
+    def _evict(self) -> None:
+        while len(self._adapters) > max(self.maxsize, 0):
+            self._adapters.popitem(last=False)
+            self.evictions += 1
+
+
+_ADAPTER_CACHE = _AdapterCache()
+
+
+def get_adapter(type_: type[T]) -> TypeAdapter[T]:
+    """Return a (cached) `TypeAdapter` for `type_`.
+
+    Adapters are kept in a process-wide LRU cache, so the pydantic-core
+    validator for a given type is only built once. Unhashable types
+    (e.g. `Annotated[...]` with unhashable metadata) get a fresh adapter.
+    """
+    return _ADAPTER_CACHE.get(type_)
+
+
+def set_adapter_cache_size(maxsize: int) -> None:
+    """Set the maximum number of cached adapters, evicting the least recently used.
+
+    A `maxsize` of `0` disables caching.
+    """
+    _ADAPTER_CACHE.resize(maxsize)
+
+
+def adapter_cache_info() -> AdapterCacheInfo:
+    """Return hit / miss / eviction counters for the adapter cache."""
+    return _ADAPTER_CACHE.info()
+
+
+def clear_adapter_cache() -> None:
+    """Drop all cached adapters and reset the counters."""
+    _ADAPTER_CACHE.clear()
+
 
 def parse_as(
     type_: type[T],
@@ -57,7 +174,7 @@ def parse_as(
         ```
 
     """
-    adapter = TypeAdapter(type_)
+    adapter = get_adapter(type_)
 
     if get_origin(type_) is list and isinstance(data, dict):
         data = next(iter(data.values()))
@@ -65,3 +182,321 @@ def parse_as(
     parser: Callable[[Any], T] = getattr(adapter, f"validate_{mode}")
 
     return parser(data)
+
+
+class ParsedFile(NamedTuple):
+    value: Any
+    bytes_parsed: int
+    elapsed: float
+
+
+def parse_file(
+    type_: type[T],
+    path: str | os.PathLike,
+    mode: Literal["json", "strings"] = "json",
+    *,
+    max_read_size: int = DEFAULT_MAX_READ_SIZE,
+    chunk_size: int = 1 << 20,
+) -> ParsedFile:
+    """Parse the contents of a JSON file as `type_`.
+
+    The file is read as `bytes` and handed straight to the adapter, instead of
+    being decoded to a `str` first. A `list[...]` file larger than
+    `max_read_size` bytes is streamed element by element via `iter_parse_json`
+    instead, so only one element is held at a time; any other type needs the
+    whole document in memory regardless.
+
+    Args:
+        type_: The type to parse the file as.
+        path: The path of the file to parse.
+        mode: `json` to validate the file as JSON, or `strings` to load it and
+            validate it in strings mode.
+        max_read_size: The largest `list[...]` file (in bytes) to read whole.
+        chunk_size: Number of bytes to read at a time when streaming.
+
+    Returns:
+        A `ParsedFile` with the parsed `value`, the number of `bytes_parsed`
+        and the `elapsed` time in seconds.
+
+    Raises:
+        ValidationError: If the file is not valid JSON or doesn't match `type_`,
+            whether it was read whole or streamed.
+
+    Example:
+        ```python
+        result = parse_file(list[ExampleModel], "dump.json")
+        print(f"{result.bytes_parsed / result.elapsed / 1e6:.1f} MB/s")
+        ```
+    """
+    start = time.perf_counter()
+    adapter = get_adapter(type_)
+
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size > max_read_size and mode == "json" and get_origin(type_) is list:
+            (item_type,) = get_args(type_) or (Any,)
+            value = _stream_list(item_type, f, chunk_size)
+            return ParsedFile(value, size, time.perf_counter() - start)
+        data = f.read()
+
+    if mode == "strings":
+        value = adapter.validate_strings(json.loads(data))
+    else:
+        value = adapter.validate_json(data)
+    return ParsedFile(value, size, time.perf_counter() - start)
+
+
+def _stream_list(item_type: Any, f: IO[bytes], chunk_size: int) -> list[Any]:
+    """Stream a JSON array, raising one `ValidationError` like `validate_json`."""
+    title = f"list[{getattr(item_type, '__name__', item_type)}]"
+    try:
+        return list(
+            iter_parse_json(
+                item_type, f, format="array", errors="collect", chunk_size=chunk_size
+            )
+        )
+    except ParseManyError as e:
+        line_errors = [
+            {**error, "loc": (index, *error["loc"])}
+            for index, item_error in e.errors
+            for error in item_error.errors()
+        ]
+    except ValueError as e:  # malformed array structure
+        line_errors = [
+            {"type": "json_invalid", "loc": (), "input": "", "ctx": {"error": str(e)}}
+        ]
+    raise ValidationError.from_exception_data(title, line_errors)
+
+
+class ParseManyError(ValueError):
+    """Raised at the end of a `parse_many` run with `errors="collect"`.
+
+    `errors` holds `(index, ValidationError)` pairs for every item that failed.
+    """
+
+    def __init__(self, errors: list[tuple[int, ValidationError]]):
+        self.errors = errors
+        super().__init__(f"{len(errors)} item(s) failed validation")
+
+
+def parse_many(
+    type_: type[T],
+    items: Iterable[Any],
+    mode: Literal["python", "json", "strings"] = "python",
+    *,
+    batch_size: int | None = None,
+    errors: Literal["raise", "skip", "collect"] = "raise",
+) -> Iterator[T] | Iterator[list[T]]:
+    """Lazily parse each item of an iterable as `type_`.
+
+    Args:
+        type_: The type to parse each item as.
+        items: The items to parse, consumed one at a time.
+        mode: The mode to use for parsing, see `parse_as`.
+        batch_size: If given, yield lists of up to `batch_size` parsed items
+            instead of single items.
+        errors: What to do with items that fail validation: `raise` the first
+            error, `skip` them, or `collect` them and raise a `ParseManyError`
+            once every valid item has been yielded.
+
+    Yields:
+        The parsed items (or batches of parsed items).
+
+    Example:
+        ```python
+        for user in parse_many(User, rows, errors="skip"):
+            ...
+        ```
+    """
+    parser: Callable[[Any], T] = getattr(get_adapter(type_), f"validate_{mode}")
+    parsed = _parse_each(parser, items, errors)
+    if batch_size is None:
+        yield from parsed
+        return
+    if batch_size < 1:
+        raise ValueError("batch_size must be a positive integer")
+    batch: list[T] = []
+    try:
+        for value in parsed:
+            batch.append(value)
+            if len(batch) == batch_size:
+                yield batch
+                batch = []
+    except ParseManyError:
+        # the collected errors are raised after the last item: flush the
+        # partial batch first
+        if batch:
+            yield batch
+        raise
+    if batch:
+        yield batch
+
+
+def _parse_each(
+    parser: Callable[[Any], T],
+    items: Iterable[Any],
+    errors: Literal["raise", "skip", "collect"],
+) -> Iterator[T]:
+    collected: list[tuple[int, ValidationError]] = []
+    for index, item in enumerate(items):
+        try:
+            value = parser(item)
+        except ValidationError as e:
+            if errors == "raise":
+                raise
+            if errors == "collect":
+                collected.append((index, e))
+            continue
+        yield value
+    if collected:
+        raise ParseManyError(collected)
+
+
+def iter_parse_json(
+    type_: type[T],
+    source: str | os.PathLike | IO[bytes] | Iterable[bytes],
+    *,
+    format: Literal["auto", "ndjson", "array"] = "auto",
+    batch_size: int | None = None,
+    errors: Literal["raise", "skip", "collect"] = "raise",
+    chunk_size: int = 1 << 16,
+) -> Iterator[T] | Iterator[list[T]]:
+    """Stream-parse NDJSON or a top-level JSON array, one item at a time.
+
+    Only one item (plus one read chunk) is held in memory at a time, so
+    arbitrarily large exports can be validated.
+
+    Args:
+        type_: The type to parse each item as (e.g. `Model`, not `list[Model]`).
+        source: A file path, a binary file object, or an iterable of `bytes` chunks.
+        format: `ndjson` (one JSON document per line), `array` (a top-level
+            JSON array), or `auto` to pick `array` if the input starts with `[`.
+        batch_size: See `parse_many`.
+        errors: See `parse_many`. Malformed array structure always raises.
+        chunk_size: Number of bytes to read at a time from paths and files.
+
+    Yields:
+        The parsed items (or batches of parsed items).
+    """
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as f:
+            yield from iter_parse_json(
+                type_,
+                f,
+                format=format,
+                batch_size=batch_size,
+                errors=errors,
+                chunk_size=chunk_size,
+            )
+        return
+
+    chunks = (
+        iter(lambda: source.read(chunk_size), b"")
+        if hasattr(source, "read")
+        else iter(source)
+    )
+    if format == "auto":
+        chunks, format = _sniff_format(chunks)
+    split = _split_json_array if format == "array" else _split_lines
+    yield from parse_many(
+        type_, split(chunks), mode="json", batch_size=batch_size, errors=errors
+    )
+
+
+def _sniff_format(
+    chunks: Iterator[bytes],
+) -> tuple[Iterator[bytes], Literal["ndjson", "array"]]:
+    seen = []
+    for chunk in chunks:
+        seen.append(chunk)
+        if stripped := chunk.lstrip():
+            format = "array" if stripped[:1] == b"[" else "ndjson"
+            break
+    else:
+        format = "ndjson"
+
+    def replay() -> Iterator[bytes]:
+        yield from seen
+        yield from chunks
+
+    return replay(), format
+
+
+def _split_lines(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    pending = b""
+    for chunk in chunks:
+        *lines, pending = (pending + chunk).split(b"\n")
+        yield from (line for line in lines if line.strip())
+    if pending.strip():
+        yield pending
+
+
+_JSON_STRUCTURE = re.compile(rb'[\[\]{}",\\]')
+
+
+def _split_json_array(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """Yield the raw bytes of each element of a top-level JSON array."""
+    item = bytearray()
+    depth = 0
+    in_string = closed = False
+    skip_to = 0  # index in the current chunk up to which bytes are escaped
+    n_items = 0
+
+    for chunk in chunks:
+        if closed:
+            if chunk.strip():
+                raise ValueError("unexpected data after the end of the JSON array")
+            continue
+        if depth == 0:
+            chunk = chunk.lstrip()
+            if not chunk:
+                continue
+            if chunk[:1] != b"[":
+                raise ValueError("expected a top-level JSON array")
+            chunk, depth = chunk[1:], 1
+
+        start = 0
+        for match in _JSON_STRUCTURE.finditer(chunk, skip_to):
+            i = match.start()
+            if i < skip_to:
+                continue
+            char = chunk[i : i + 1]
+            if in_string:
+                if char == b"\\":
+                    skip_to = i + 2
+                elif char == b'"':
+                    in_string = False
+            elif char == b'"':
+                in_string = True
+            elif char in b"[{":
+                depth += 1
+            elif char == b"," and depth == 1:
+                item += chunk[start:i]
+                yield _array_item(item, n_items)
+                item.clear()
+                n_items += 1
+                start = i + 1
+            elif char in b"]}":
+                depth -= 1
+                if depth == 0:
+                    item += chunk[start:i]
+                    if item.strip() or n_items:
+                        yield _array_item(item, n_items)
+                    if chunk[i + 1 :].strip():
+                        raise ValueError(
+                            "unexpected data after the end of the JSON array"
+                        )
+                    closed = True
+                    break
+        else:
+            item += chunk[start:]
+        skip_to = max(skip_to - len(chunk), 0)
+
+    if not closed:
+        raise ValueError("unterminated JSON array")
+
+
+def _array_item(item: bytearray, index: int) -> bytes:
+    if not (raw := bytes(item).strip()):
+        raise ValueError(f"empty element at index {index} of JSON array")
+    return raw
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# client_server is a directory of scripts importing each other by module name
+sys.path.insert(0, str(Path(__file__).parents[1] / "client_server"))
@@ -0,0 +1,15 @@
+import numpy as np
+from engine import run_headless
+from settings import settings
+
+
+def test_seeded_runs_repeat_latencies(monkeypatch):
+    monkeypatch.setattr(settings, "service_model", True)
+    runs = [run_headless(200, seed=3) for _ in range(2)]
+
+    latencies = [
+        np.array([[m.latency_p50, m.latency_p95, m.latency_p99] for m in metrics])
+        for metrics in runs
+    ]
+    assert not np.isnan(latencies[0]).all()
+    np.testing.assert_array_equal(*latencies)
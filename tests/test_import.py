@@ -0,0 +1,39 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+SRC = Path(__file__).parents[1] / "src"
+
+# generous for a cold interpreter on a slow CI box; an eager import of
+# pydantic-settings and the settings models alone takes about twice this
+IMPORT_BUDGET = 0.1
+
+COLD_IMPORT = """
+import json, sys, time
+start = time.perf_counter()
+import yt
+elapsed = time.perf_counter() - start
+print(json.dumps({"elapsed": elapsed, "modules": sorted(sys.modules)}))
+"""
+
+
+def test_cold_import_is_cheap():
+    env = os.environ | {
+        "PYTHONPATH": os.pathsep.join(
+            filter(None, [str(SRC), os.environ.get("PYTHONPATH")])
+        )
+    }
+    result = subprocess.run(
+        [sys.executable, "-c", COLD_IMPORT],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    report = json.loads(result.stdout)
+
+    heavy = {"pydantic", "pydantic_settings", "yt.settings", "yt.utilities"}
+    assert heavy.isdisjoint(report["modules"])
+    assert report["elapsed"] < IMPORT_BUDGET
@@ -0,0 +1,21 @@
+import numpy as np
+from engine import run_headless
+from recording import MetricsRecorder, load_recording
+from settings import settings
+
+
+def test_recording_keeps_per_server_latency(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "service_model", True)
+    recorder = MetricsRecorder(str(tmp_path / "run"), chunk_steps=64)
+    metrics = run_headless(150, seed=5, recorder=recorder)
+
+    assert any(m.server_latency for m in metrics)
+
+    recording = load_recording(str(tmp_path / "run"))
+    assert len(recording) == len(metrics)
+    for i, m in enumerate(metrics):
+        latencies = recording.latencies(i)
+        assert latencies.keys() == recording.servers(i).keys()
+        for server, latency in latencies.items():
+            expected = m.server_latency.get(server, (np.nan,) * 3)
+            np.testing.assert_array_equal(latency, expected)
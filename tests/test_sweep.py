@@ -0,0 +1,13 @@
+from sweep import grid, run_sweep
+
+
+def test_configs_change_the_simulation():
+    configs = grid({"max_connections": [2, 50], "num_servers": [1, 8]})
+    rows = run_sweep(configs, [[1]] * len(configs), steps=300, workers=2)
+
+    assert [row["max_connections"] for row in rows] == [2, 2, 50, 50]
+    results = {(row["servers_mean"], row["refusals"]) for row in rows}
+    assert len(results) == len(configs)
+    # two connections per server can't hold the initial clients without refusals
+    assert rows[0]["refusals"] > 0
+    assert rows[-1]["refusals"] == 0
@@ -0,0 +1,29 @@
+import numpy as np
+from traces import trace_steps
+
+
+def test_trace_steps_groups_arrivals_across_chunks():
+    chunks = [
+        (np.array([0.0, 0.1, 2.5]), None),
+        (np.array([2.6, 7.0]), np.array([3.0, 10.0])),
+    ]
+    assert list(trace_steps(chunks, time_scale=1.0)) == [
+        [None, None],
+        [],
+        [None, 3],
+        [],
+        [],
+        [],
+        [],
+        [10],
+    ]
+
+
+def test_trace_steps_skips_chunks_before_start():
+    chunks = [(np.array([0.0, 1.0, 2.0]), None), (np.array([10.0, 11.0]), None)]
+    assert list(trace_steps(chunks, time_scale=2.0, start=5.0)) == [
+        [],
+        [],
+        [None],
+        [None],
+    ]
@@ -0,0 +1,50 @@
+import pytest
+from pydantic import BaseModel, ValidationError
+
+from yt.utilities import ParseManyError, parse_file, parse_many
+
+
+class M(BaseModel):
+    x: int
+
+
+def test_parse_many_collect_yields_partial_batch_before_raising():
+    items = [{"x": 1}, {"x": 2}, {"x": 3}, {"x": "bad"}]
+    batches = []
+    with pytest.raises(ParseManyError) as exc_info:
+        for batch in parse_many(M, items, batch_size=2, errors="collect"):
+            batches.append(batch)
+
+    assert batches == [[M(x=1), M(x=2)], [M(x=3)]]
+    assert [index for index, _ in exc_info.value.errors] == [3]
+
+
+@pytest.mark.parametrize(
+    "content",
+    [b'[{"x": 1}, {"x": "bad"}, {"x": 3}]', b'[{"x": 1}, {"x": 2}'],
+    ids=["invalid item", "unterminated array"],
+)
+def test_parse_file_raises_validation_error_when_streaming(tmp_path, content):
+    path = tmp_path / "items.json"
+    path.write_bytes(content)
+
+    with pytest.raises(ValidationError) as read_whole:
+        parse_file(list[M], path)
+    with pytest.raises(ValidationError) as streamed:
+        parse_file(list[M], path, max_read_size=0, chunk_size=4)
+
+    assert [e["type"] for e in streamed.value.errors()] == [
+        e["type"] for e in read_whole.value.errors()
+    ]
+    assert [e["loc"] for e in streamed.value.errors()] == [
+        e["loc"] for e in read_whole.value.errors()
+    ]
+
+
+def test_parse_file_streams_large_lists(tmp_path):
+    path = tmp_path / "items.json"
+    path.write_bytes(b'[{"x": 1}, {"x": 2}, {"x": 3}]')
+
+    result = parse_file(list[M], path, max_read_size=0, chunk_size=4)
+    assert result.value == [M(x=1), M(x=2), M(x=3)]
+    assert result.bytes_parsed == path.stat().st_size